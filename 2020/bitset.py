@@ -0,0 +1,105 @@
+"""Sets of small non-negative ints as plain Python ints, one bit per member.
+
+Also resolves one-to-one assignments from per-slot candidate bitsets.
+"""
+
+import collections
+import functools
+import operator
+import string
+
+
+LOWERCASE = {char: i for i, char in enumerate(string.ascii_lowercase)}
+
+
+def from_chars(chars, index=None):
+    """Returns the bitset of the given characters under an alphabet index."""
+    if index is None:
+        index = LOWERCASE
+    bits = 0
+    for char in chars:
+        bits |= 1 << index[char]
+    return bits
+
+
+def union(bitsets):
+    return functools.reduce(operator.or_, bitsets, 0)
+
+
+def intersection(bitsets):
+    return functools.reduce(operator.and_, bitsets)
+
+
+def popcount(bits):
+    return bits.bit_count()
+
+
+def lowest_bit(bits):
+    """Returns the index of the lowest set bit, or -1 for an empty set."""
+    return (bits & -bits).bit_length() - 1
+
+
+def iter_bits(bits):
+    """Yields the index of each set bit, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def propagate(candidates, assignment):
+    """Pins every slot left with a single candidate, cascading as it goes.
+
+    candidates is a list of bitsets, one per slot. A pinned candidate is struck
+    from every other slot in place, and assignment maps slots to their pins.
+    """
+    queue = collections.deque(
+        slot for slot, bits in enumerate(candidates)
+        if slot not in assignment and popcount(bits) == 1)
+    while queue:
+        slot = queue.popleft()
+        if slot in assignment:
+            continue
+        if not candidates[slot]:
+            raise ValueError(f'No candidate left for slot {slot}')
+        pin = lowest_bit(candidates[slot])
+        assignment[slot] = pin
+        for other, bits in enumerate(candidates):
+            if other not in assignment and bits >> pin & 1:
+                candidates[other] = bits & ~(1 << pin)
+                if popcount(candidates[other]) == 1:
+                    queue.append(other)
+
+
+def match(candidates, assignment):
+    """Completes the assignment with augmenting paths (bipartite matching)."""
+    owner = {pin: slot for slot, pin in assignment.items()}
+    for slot in range(len(candidates)):
+        if slot in assignment:
+            continue
+        parent = {}
+        frontier = collections.deque([slot])
+        seen = set()
+        free_pin = None
+        while frontier and free_pin is None:
+            cur = frontier.popleft()
+            for pin in iter_bits(candidates[cur]):
+                if pin in seen:
+                    continue
+                seen.add(pin)
+                parent[pin] = cur
+                if pin not in owner:
+                    free_pin = pin
+                    break
+                frontier.append(owner[pin])
+        if free_pin is None:
+            raise ValueError(f'No consistent candidate for slot {slot}')
+        pin = free_pin
+        while True:
+            cur = parent[pin]
+            prev = assignment.get(cur)
+            assignment[cur] = pin
+            owner[pin] = cur
+            if cur == slot:
+                break
+            pin = prev
@@ -1,6 +1,5 @@
 import argparse
 import functools
-import itertools
 import operator
 
 
@@ -11,17 +10,68 @@ def _parse_input():
                         type=argparse.FileType('r'),
                         help='Input text file for this puzzle')
     args = parser.parse_args()
-    return (int(line) for line in args.infile.readlines())
+    return [int(line) for line in args.infile.readlines()]
 
 
-def main(input, n):
-    for combo in itertools.combinations(input, n):
-        if sum(combo) == 2020:
-            return functools.reduce(operator.mul, combo, 1)
+def two_sum(values, target):
+    """Returns a pair of values summing to target, or None. O(N) via hashing."""
+    seen = set()
+    for val in values:
+        if target - val in seen:
+            return target - val, val
+        seen.add(val)
+
+
+def k_sum(values, k, target=2020):
+    """Returns a tuple of k distinct entries summing to target, or None.
+
+    Sorts once, fixes the first k-2 entries in nested loops and closes out the
+    last two with a two-pointer sweep, so k=3 is O(N^2) instead of O(N^3).
+    """
+    if k == 1:
+        return (target,) if target in values else None
+    if k == 2:
+        return two_sum(values, target)
+    ordered = sorted(values)
+    return _k_sum_sorted(ordered, k, target, 0)
+
+
+def _k_sum_sorted(ordered, k, target, start):
+    n = len(ordered)
+    if k == 2:
+        lo, hi = start, n - 1
+        while lo < hi:
+            total = ordered[lo] + ordered[hi]
+            if total == target:
+                return ordered[lo], ordered[hi]
+            if total < target:
+                lo += 1
+            else:
+                hi -= 1
+        return None
+    largest_rest = sum(ordered[n - k + 1:])
+    for i in range(start, n - k + 1):
+        if i > start and ordered[i] == ordered[i - 1]:
+            continue
+        if sum(ordered[i:i + k]) > target:
+            break
+        if ordered[i] + largest_rest < target:
+            continue
+        rest = _k_sum_sorted(ordered, k - 1, target - ordered[i], i + 1)
+        if rest is not None:
+            return (ordered[i],) + rest
+    return None
+
+
+def main(input, n, target=2020):
+    combo = k_sum(input, n, target)
+    if combo is not None:
+        return functools.reduce(operator.mul, combo, 1)
 
 
 if __name__ == '__main__':
-    answer_one = main(_parse_input(), 2)
+    expenses = _parse_input()
+    answer_one = main(expenses, 2)
     print(f'Part One: {answer_one}')
-    answer_two = main(_parse_input(), 3)
-    print(f'Part Two: {answer_two}')
\ No newline at end of file
+    answer_two = main(expenses, 3)
+    print(f'Part Two: {answer_two}')
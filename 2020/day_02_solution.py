@@ -1,25 +1,89 @@
 import argparse
+import array
 import collections
+import re
+
+
+PASSWD_PATTERN = re.compile(rb'(\d+)-(\d+) (\S): (\S+)')
+CHUNK_SIZE = 1 << 20
 
 
 Passwd = collections.namedtuple('Passwd',
                                ('lower', 'upper', 'letter', 'passwd'))
 
 
+Columns = collections.namedtuple('Columns',
+                                 ('buffer', 'lower', 'upper', 'letter',
+                                  'start', 'end'))
+
+
 def _parse_input():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument('infile',
-                        type=argparse.FileType('r'),
+                        type=argparse.FileType('rb'),
                         help='Input text file for this puzzle')
     args = parser.parse_args()
-    result = []
-    for line in args.infile.readlines():
-        first, middle, passwd = line.split()
-        lower, upper = first.split('-')
-        letter = middle[:-1]
-        result.append(Passwd(int(lower), int(upper), letter, passwd))
-    return result
+    return args.infile
+
+
+def parse_columns(buffer):
+    """Parses a whole input buffer into column arrays.
+
+    Passwords aren't copied out of the buffer; each row just records the
+    offsets of its password so the policies can index into the buffer.
+    """
+    lower, upper = array.array('I'), array.array('I')
+    letter = bytearray()
+    start, end = array.array('Q'), array.array('Q')
+    for match in PASSWD_PATTERN.finditer(buffer):
+        lower.append(int(match[1]))
+        upper.append(int(match[2]))
+        letter.append(match[3][0])
+        start.append(match.start(4))
+        end.append(match.end(4))
+    return Columns(buffer, lower, upper, bytes(letter), start, end)
+
+
+def entries(columns):
+    """Yields Passwd tuples for each row of the given columns."""
+    buffer = columns.buffer
+    for lower, upper, letter, start, end in zip(*columns[1:]):
+        yield Passwd(lower, upper, chr(letter), buffer[start:end].decode())
+
+
+def validate_columns(columns):
+    """Returns the number of rows valid under the part one and two policies."""
+    buffer = columns.buffer
+    valid_one = 0
+    valid_two = 0
+    for lower, upper, letter, start, end in zip(*columns[1:]):
+        if lower <= buffer.count(letter, start, end) <= upper:
+            valid_one += 1
+        first = start + lower - 1 < end and buffer[start + lower - 1] == letter
+        second = start + upper - 1 < end and buffer[start + upper - 1] == letter
+        if first != second:
+            valid_two += 1
+    return valid_one, valid_two
+
+
+def validate_stream(infile, chunk_size=CHUNK_SIZE):
+    """Validates a binary file chunk by chunk, in constant memory."""
+    valid_one = 0
+    valid_two = 0
+    carry = b''
+    while True:
+        chunk = infile.read(chunk_size)
+        if not chunk:
+            break
+        chunk = carry + chunk
+        cut = chunk.rfind(b'\n') + 1
+        chunk, carry = chunk[:cut], chunk[cut:]
+        one, two = validate_columns(parse_columns(chunk))
+        valid_one += one
+        valid_two += two
+    one, two = validate_columns(parse_columns(carry))
+    return valid_one + one, valid_two + two
 
 
 def validate_for_part_one(input):
@@ -48,9 +112,6 @@ def validate_for_part_two(input):
 
 
 if __name__ == '__main__':
-    valid, invalid = validate_for_part_one(_parse_input())
-    answer_one = len(valid)
+    answer_one, answer_two = validate_stream(_parse_input())
     print(f'Part One: {answer_one}')
-    valid, invalid = validate_for_part_two(_parse_input())
-    answer_two = len(valid)
-    print(f'Part Two: {answer_two}')
\ No newline at end of file
+    print(f'Part Two: {answer_two}')
@@ -1,8 +1,16 @@
 import argparse
+import collections
 import functools
+import math
 import operator
 
 
+TREE_TABLE = bytes.maketrans(b'.#', b'\x00\x01')
+
+
+Field = collections.namedtuple('Field', ('cells', 'width', 'height'))
+
+
 def _parse_input():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser()
@@ -10,25 +18,46 @@ def _parse_input():
                         type=argparse.FileType('r'),
                         help='Input text file for this puzzle')
     args = parser.parse_args()
-    return args.infile.readlines()
+    return load_field(args.infile.read())
+
+
+def load_field(text):
+    """Packs the field into one flat buffer of 0/1 cells, row by row."""
+    rows = text.split()
+    cells = ''.join(rows).encode().translate(TREE_TABLE)
+    return Field(cells, len(rows[0]), len(rows))
+
+
+def trees_for_slopes(slopes, field):
+    """Returns the tree count for each (dx, dy) slope, in order.
+
+    A slope comes back to the same column every width / gcd(dx, width) steps,
+    so the cells it lands on split into that many evenly spaced runs of the
+    flat buffer. Each run is counted with one strided slice, which keeps the
+    Python-level work per slope proportional to the width, not the height.
+    """
+    cells, width, height = field
+    counts = []
+    for dx, dy in slopes:
+        period = width // math.gcd(dx, width)
+        stride = period * dy * width
+        count = 0
+        for step in range(min(period, (height - 1) // dy + 1)):
+            start = step * dy * width + step * dx % width
+            count += cells[start::stride].count(1)
+        counts.append(count)
+    return counts
 
 
 def trees_for_slope(dx, dy, field):
-    trees = 0
-    x, y = 0, 0
-    while y < len(field):
-        if field[y][x] == '#':
-            trees += 1
-        x = (x + dx) % (len(field[0]) - 1)
-        y += dy
-    return trees
+    return trees_for_slopes(((dx, dy),), field)[0]
 
 
 if __name__ == '__main__':
-    answer_one = trees_for_slope(3, 1, _parse_input())
-    print(f'Part One: {answer_one}')
     field = _parse_input()
+    answer_one = trees_for_slope(3, 1, field)
+    print(f'Part One: {answer_one}')
     slopes_to_try = ((1, 1), (3, 1), (5, 1), (7, 1), (1, 2))
-    tree_counts = (trees_for_slope(x, y, field) for x, y in slopes_to_try)
+    tree_counts = trees_for_slopes(slopes_to_try, field)
     answer_two = functools.reduce(operator.mul, tree_counts, 1)
-    print(f'Part Two: {answer_two}')
\ No newline at end of file
+    print(f'Part Two: {answer_two}')
@@ -2,12 +2,27 @@ import argparse
 import collections
 import functools
 import operator
+import re
 
 
 Creds = collections.namedtuple('Creds',
                               ('lower', 'upper', 'letter', 'passwd'))
 
 
+REQUIRED_FIELDS = ('byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid')
+FIELD_BITS = {field: 1 << i for i, field in enumerate(REQUIRED_FIELDS)}
+ALL_FIELDS = (1 << len(REQUIRED_FIELDS)) - 1
+FIELD_PATTERNS = {
+    'byr': re.compile(r'19[2-9]\d|200[0-2]'),
+    'iyr': re.compile(r'201\d|2020'),
+    'eyr': re.compile(r'202\d|2030'),
+    'hgt': re.compile(r'1[5-8]\dcm|19[0-3]cm|59in|6\din|7[0-6]in'),
+    'hcl': re.compile(r'#[0-9a-f]{6}'),
+    'ecl': re.compile(r'amb|blu|brn|gry|grn|hzl|oth'),
+    'pid': re.compile(r'\d{9}'),
+}
+
+
 def _parse_input():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser()
@@ -15,108 +30,64 @@ def _parse_input():
                         type=argparse.FileType('r'),
                         help='Input text file for this puzzle')
     args = parser.parse_args()
-    entries = []
-    text = args.infile.read()
-    for entry_data in text.split('\n\n'):
-        entry = {}
-        for field in entry_data.split():
-            key, val = field.split(':')
-            entry[key] = val
-        entries.append(entry)
-    return entries
+    return args.infile
+
+
+def records(infile):
+    """Yields each passport's 'key:val' fields, reading one line at a time."""
+    record = []
+    for line in infile:
+        fields = line.split()
+        if fields:
+            record.extend(fields)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def field_masks(record):
+    """Returns bitmasks of the required fields present and valid in a record."""
+    present = 0
+    valid = 0
+    for field in record:
+        key, _, val = field.partition(':')
+        bit = FIELD_BITS.get(key)
+        if bit is None:
+            continue
+        present |= bit
+        if FIELD_PATTERNS[key].fullmatch(val):
+            valid |= bit
+    return present, valid
+
+
+def validate_stream(infile):
+    """Counts passports valid for each part in a single streaming pass."""
+    answer_one = 0
+    answer_two = 0
+    for record in records(infile):
+        present, valid = field_masks(record)
+        answer_one += present == ALL_FIELDS
+        answer_two += valid == ALL_FIELDS
+    return answer_one, answer_two
 
 
 def valid_for_part_one(entry):
-    required_fields = ('byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid')
-    for field in required_fields:
-        if field not in entry:
-            return False
-    return True
+    present, _ = field_masks(f'{key}:{val}' for key, val in entry.items())
+    return present == ALL_FIELDS
 
 
 def valid_for_part_two(entry):
-    if not valid_for_part_one(entry):
-        return False
-    field_validations = (
-        validate_byr(entry['byr']),
-        validate_iyr(entry['iyr']),
-        validate_eyr(entry['eyr']),
-        validate_hgt(entry['hgt']),
-        validate_hcl(entry['hcl']),
-        validate_ecl(entry['ecl']),
-        validate_pid(entry['pid']),
-    )
-    if not all(field_validations):
-        return False
-    return True
-
-
-def validate_byr(data):
-    try:
-        return 1920 <= int(data) <= 2002
-    except ValueError:
-        return False
-
-
-def validate_iyr(data):
-    try:
-        return 2010 <= int(data) <= 2020
-    except ValueError:
-        return False
-
-
-def validate_eyr(data):
-    try:
-        return 2020 <= int(data) <= 2030
-    except ValueError:
-        return False
-
-
-def validate_hgt(data):
-    try:
-        units = data[-2:]
-        if units == 'cm':
-            return 150 <= int(data[:-2]) <= 193
-        if units == 'in':
-            return 59 <= int(data[:-2]) <= 76
-    except ValueError:
-        return False
-    return False
-
-
-def validate_hcl(data):
-    if len(data) != 7:
-        return False
-    if not data[0] == '#':
-        return False
-    for char in data[1:]:
-        if char not in ('0123456789abcdef'):
-            return False
-    return True
-
-
-def validate_ecl(data):
-    return data in ('amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth')
-
-
-def validate_pid(data):
-    if len(data) != 9:
-        return False
-    try:
-        int(data)
-    except ValueError:
-        return False
-    return True
+    _, valid = field_masks(f'{key}:{val}' for key, val in entry.items())
+    return valid == ALL_FIELDS
 
 
 def main(input):
-    valid = [entry for entry in input if valid_for_part_one(entry)]
-    answer_one = len(valid)
+    answer_one, answer_two = validate_stream(input)
     print(f'Part One: {answer_one}')
-    valid = [entry for entry in input if valid_for_part_two(entry)]
-    answer_two = len(valid)
-    print(f'Part Two: {answer_two}')    
+    print(f'Part Two: {answer_two}')
 
 
 if __name__ == '__main__':
-    main(_parse_input())
\ No newline at end of file
+    main(_parse_input())
@@ -1,7 +1,7 @@
 import argparse
-import functools
-import itertools
-import operator
+
+
+SEAT_TABLE = str.maketrans('FBLR', '0101')
 
 
 def _parse_input():
@@ -11,44 +11,39 @@ def _parse_input():
                         type=argparse.FileType('r'),
                         help='Input text file for this puzzle')
     args = parser.parse_args()
-    return args.infile.readlines()
-
-
-def partition(operations, left_op, right_op, start, end):
-    lower = start
-    upper = end
-    for op in operations:
-        mid = (lower + upper) // 2
-        if op == left_op:
-            upper = mid
-            continue
-        if op == right_op:
-            lower = mid + 1
-            continue
-        raise ValueError(f'Invalid paritioning operation: {op}')
-    if lower != upper:
-        raise RuntimeError(f'Binary partitioning fail: {lower}, {upper}')
-    return lower
+    return args.infile.read()
+
+
+def seat_ids(text):
+    """Decodes every boarding pass in a buffer straight to its seat id.
+
+    The row and column bits are adjacent, so once F/L map to 0 and B/R map to
+    1 the whole code is just the binary seat id.
+    """
+    return [int(code, 2) for code in text.translate(SEAT_TABLE).split()]
 
 
 def seat_from_code(code):
-    row = partition(code[:7], 'F', 'B', 0, 127)
-    col = partition(code[-3:], 'L', 'R', 0, 7)
-    seat_id = (8 * row) + col
+    seat_id = int(code.translate(SEAT_TABLE), 2)
+    row, col = seat_id >> 3, seat_id & 7
     return row, col, seat_id
 
 
+def missing_seat(ids):
+    """Finds the one gap in a run of seat ids via the arithmetic series sum."""
+    lowest, highest = min(ids), max(ids)
+    if len(ids) != highest - lowest:
+        raise RuntimeError(
+            f'Expected exactly one gap in {lowest}..{highest}, '
+            f'found {highest - lowest + 1 - len(ids)}')
+    return (lowest + highest) * (highest - lowest + 1) // 2 - sum(ids)
+
+
 def main(input):
-    seats = [seat_from_code(line.rstrip()) for line in input]
-    seat_ids = [seat_id for _, _, seat_id in seats]
-    answer_one = max(seat_ids)
+    ids = seat_ids(input)
+    answer_one = max(ids)
     print(f'Part One: {answer_one}')
-    all_seats = [x for x in range(min(seat_ids), max(seat_ids) + 1)]
-    for seat in seat_ids:
-        all_seats.remove(seat)
-    if len(all_seats) != 1:
-        raise RuntimeError(f'Failed to locate seat: {all_seats}')
-    answer_two = all_seats[0]
+    answer_two = missing_seat(ids)
     print(f'Part Two: {answer_two}')
 
 
@@ -1,6 +1,6 @@
 import argparse
-import functools
-import itertools
+
+import bitset
 
 
 def _parse_args():
@@ -13,20 +13,20 @@ def _parse_args():
     return args.infile.read()
 
 
-def uniques_in_group(group):
-    return len(set(itertools.chain.from_iterable(group)) - {'\n'})
+def group_bitsets(group):
+    return [bitset.from_chars(person) for person in group]
 
 
-def intersection(a, b):
-    return set(a).intersection(set(b))
+def uniques_in_group(group):
+    return bitset.popcount(bitset.union(group_bitsets(group)))
 
 
 def intersection_size_in_group(group):
-    return len(functools.reduce(intersection, group))
+    return bitset.popcount(bitset.intersection(group_bitsets(group)))
 
 
 def main(input):
-    groups = [group.split('\n') for group in input.split('\n\n')]
+    groups = [group.split() for group in input.split('\n\n')]
     answer_one = sum(uniques_in_group(group) for group in groups)
     answer_two = sum(intersection_size_in_group(group) for group in groups)
     return answer_one, answer_two
@@ -1,4 +1,5 @@
 import argparse
+import collections
 
 
 def _parse_args():
@@ -28,37 +29,66 @@ def parse_rules(input):
     return rules
 
 
-def can_hold(outer, inner, rules):
-    if rules[outer] is None:
-        return False
-    options = [name for number, name in rules[outer]]
-    if inner in options:
-        return True
-    return any(can_hold(option,inner, rules) for option in options)
+class BagGraph:
+    """Bag rules indexed both ways, for cheap repeated queries.
+
+    Contents are summed bottom-up once per color and memoised, and the reverse
+    index lets "what can hold X" be a single BFS instead of a search from
+    every outer bag.
+    """
+    def __init__(self, rules):
+        self._contents = {}
+        self._holders = collections.defaultdict(set)
+        self._totals = {}
+        for outer, options in rules.items():
+            self._contents[outer] = options or ()
+            for _, inner in self._contents[outer]:
+                self._holders[inner].add(outer)
+
+    def containers_of(self, color):
+        """Returns every color that can eventually contain the given color."""
+        found = set()
+        frontier = collections.deque([color])
+        while frontier:
+            for outer in self._holders[frontier.popleft()]:
+                if outer not in found:
+                    found.add(outer)
+                    frontier.append(outer)
+        found.discard(color)
+        return found
+
+    def total_inside(self, color):
+        """Returns the number of bags nested inside one bag of this color."""
+        stack = [color]
+        while stack:
+            current = stack[-1]
+            if current in self._totals:
+                stack.pop()
+                continue
+            pending = [inner for _, inner in self._contents[current]
+                       if inner not in self._totals]
+            if pending:
+                stack.extend(pending)
+                continue
+            self._totals[current] = sum(
+                number * (1 + self._totals[inner])
+                for number, inner in self._contents[current])
+            stack.pop()
+        return self._totals[color]
 
 
 def origins_for(color, rules):
-    origins = set()
-    for outer in rules:
-        if outer != color and can_hold(outer, color, rules):
-            origins.add(outer)
-    return origins
+    return BagGraph(rules).containers_of(color)
 
 
 def total_inner_bags(color, rules):
-    if rules[color] == None:
-        return 0
-    total = 0
-    for number, name in rules[color]:
-        total += number
-        total += number * (total_inner_bags(name, rules))
-    return total
+    return BagGraph(rules).total_inside(color)
 
 
 def main(input):
-    rules = parse_rules(input)
-    answer_one = len(origins_for('shiny gold', rules))
-    answer_two = total_inner_bags('shiny gold', rules)
+    graph = BagGraph(parse_rules(input))
+    answer_one = len(graph.containers_of('shiny gold'))
+    answer_two = graph.total_inside('shiny gold')
     return answer_one, answer_two
 
 
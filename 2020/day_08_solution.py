@@ -15,9 +15,29 @@ class InfiniteLoop(Exception):
     """Raised when a machine detects an infinite loop"""
 
 
+FLIPS = {'nop': 'jmp', 'jmp': 'nop'}
+
+
+def decode(prog):
+    """Splits program lines into parallel lists of ops and int args."""
+    ops = []
+    args = []
+    for line in prog:
+        op, arg = line.split()
+        ops.append(op)
+        args.append(int(arg))
+    return ops, args
+
+
+def successor(op, arg, pc):
+    return pc + arg if op == 'jmp' else pc + 1
+
+
 class Machine:
-    def __init__(self, prog):
-        self._prog = prog
+    def __init__(self, prog, flip=None):
+        self._ops, self._args = decode(prog)
+        if flip is not None:
+            self._ops[flip] = FLIPS[self._ops[flip]]
         self._seen = set()
         self._pc = 0
         self._acc = 0
@@ -33,12 +53,11 @@ class Machine:
         self._pc += 1
 
     def run(self):
-        while self._pc < len(self._prog):
+        while self._pc < len(self._ops):
             if self._pc in self._seen:
                 raise InfiniteLoop()
             self._seen.add(self._pc)
-            op, arg = self._prog[self._pc].split()
-            getattr(self, op)(int(arg))
+            getattr(self, self._ops[self._pc])(self._args[self._pc])
 
     def state(self):
         return self._acc
@@ -52,22 +71,61 @@ def debug(prog):
         return machine.state()
 
 
+def terminating(ops, args):
+    """Returns a list flagging each instruction that runs on to termination.
+
+    Every instruction has exactly one successor, so walking the reversed edges
+    back from the end of the program finds all of them in linear time.
+    """
+    end = len(ops)
+    preds = [[] for _ in range(end + 1)]
+    for pc, (op, arg) in enumerate(zip(ops, args)):
+        nxt = successor(op, arg, pc)
+        if nxt >= 0:
+            preds[min(nxt, end)].append(pc)
+    reaches_end = [False] * (end + 1)
+    reaches_end[end] = True
+    stack = [end]
+    while stack:
+        for pc in preds[stack.pop()]:
+            if not reaches_end[pc]:
+                reaches_end[pc] = True
+                stack.append(pc)
+    return reaches_end
+
+
+def find_flip(prog):
+    """Returns the index of the one nop/jmp whose flip lets the program end.
+
+    Follows the unpatched program from the start; the first nop/jmp it visits
+    whose flipped successor already runs on to the end is the fix. Returns
+    None if no flip works or the program already terminates unpatched.
+    """
+    ops, args = decode(prog)
+    end = len(ops)
+    reaches_end = terminating(ops, args)
+    if reaches_end[0]:
+        return None
+    seen = set()
+    pc = 0
+    while 0 <= pc < end and pc not in seen:
+        seen.add(pc)
+        op, arg = ops[pc], args[pc]
+        if op in FLIPS:
+            flipped = min(successor(FLIPS[op], arg, pc), end)
+            if flipped >= 0 and reaches_end[flipped]:
+                return pc
+        pc = successor(op, arg, pc)
+    return None
+
+
 def repair(prog):
-    for i in range(len(prog)):
-        op, arg = prog[i].split()
-        if op not in ('nop', 'jmp'):
-            continue
-        patched = prog[:]
-        if op == 'nop':
-            patched[i] = f'jmp {arg}'
-        elif op == 'jmp':
-            patched[i] = f'nop {arg}'
-        try:
-            machine = Machine(patched)
-            machine.run()
-            return machine.state()
-        except InfiniteLoop:
-            continue
+    flip = find_flip(prog)
+    if flip is None:
+        return None
+    machine = Machine(prog, flip=flip)
+    machine.run()
+    return machine.state()
 
 
 def main(input):
@@ -1,6 +1,5 @@
 import argparse
 import collections
-import itertools
 
 
 def _parse_args():
@@ -17,22 +16,40 @@ def _parse_args():
 
 
 class Validator:
+    """Checks each number against a sliding window of the ones before it.
+
+    The window is also kept as a multiset of counts, so checking whether two
+    entries sum to a value is one pass over the window instead of summing
+    every pair.
+    """
     def __init__(self, preamble_len):
         self._preamble_len = preamble_len
         self._preamble = collections.deque()
+        self._counts = collections.Counter()
 
     def validate(self, val):
-        valids = [sum(x) for x in itertools.combinations(self._preamble, 2)]
-        return val in valids
+        counts = self._counts
+        for x in counts:
+            y = val - x
+            if y in counts and (y != x or counts[x] > 1):
+                return True
+        return False
 
     def advance(self, val):
         if len(self._preamble) < self._preamble_len:
-            self._preamble.append(val)
+            self._push(val)
             return
         if not self.validate(val):
             return val
+        self._push(val)
+        oldest = self._preamble.popleft()
+        self._counts[oldest] -= 1
+        if not self._counts[oldest]:
+            del self._counts[oldest]
+
+    def _push(self, val):
         self._preamble.append(val)
-        self._preamble.popleft()
+        self._counts[val] += 1
 
     def feed(self, sequence):
         for element in sequence:
@@ -42,12 +59,24 @@ class Validator:
 
 
 def weakness(val, seq):
-    for length in range(1, len(seq)):
-        for start in range(0, len(seq) - length):
-            end = start + length
-            sub_seq = seq[start:end + 1]
-            if sum(sub_seq) == val:
-                return min(sub_seq) + max(sub_seq)
+    """Finds a run of at least two numbers summing to val in a single pass.
+
+    A run seq[i:j] sums to val exactly when prefix[j] - prefix[i] == val, so
+    each prefix sum only needs a lookup among the earlier ones. Insertion
+    lags two steps behind to keep runs at least two long.
+    """
+    if val is None:
+        return None
+    starts = {}
+    prefix = [0]
+    for j, x in enumerate(seq, 1):
+        prefix.append(prefix[-1] + x)
+        if j >= 2:
+            starts[prefix[j - 2]] = j - 2
+        i = starts.get(prefix[j] - val)
+        if i is not None:
+            run = seq[i:j]
+            return min(run) + max(run)
 
 
 def main(input, preamble_len):
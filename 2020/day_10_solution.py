@@ -79,6 +79,27 @@ class AdapterChain:
                 in_progress.remove(invalid)
         return [p for p in in_progress if p.tail() == self._chain[end-1]]
 
+    def count_arrangements(self, start=0, end=None):
+        """Counts the valid sequences that valid_partials would return.
+
+        Linear DP over the (sorted) chain: the ways to reach an adapter are
+        the sum of the ways to reach each earlier adapter within max_diff of
+        it, and those form a sliding window whose sum is kept as we go.
+        """
+        if end is None:
+            end = len(self._chain)
+        ways = [1]
+        window_start = start
+        window_sum = 1
+        for i in range(start + 1, end):
+            while (window_start < i and
+                   self._chain[i] - self._chain[window_start] > self._max_diff):
+                window_sum -= ways[window_start - start]
+                window_start += 1
+            ways.append(window_sum)
+            window_sum += ways[-1]
+        return ways[-1]
+
 
 class StubAdapterChain(AdapterChain):
     def __init__(self, chain=None, max_diff=3):
@@ -97,19 +118,7 @@ def main(input):
     chain = AdapterChain([0] + sorted(input) + [max(input) + 3])
     diffs = chain.diffs()
     answer_one = diffs.count(1) * diffs.count(3)
-    # Break the input down into sub-problems. This helps when there are some
-    # adapters in the chain that can never be removed because the gaps on one
-    # or the other side of them are too great. Pragmatically, this approach
-    # works for my input, but it would still have terrible performace on
-    # very large inputs or inputs with few or no always-included adapters.
-    end = 0
-    partial_count = 1
-    while end < len(diffs):
-        start = end
-        end = diffs.index(3, end) + 1
-        valids = chain.valid_partials(start=start, end=end)
-        partial_count *= len(valids)
-    answer_two = partial_count
+    answer_two = chain.count_arrangements()
     return answer_one, answer_two
 
 
@@ -1,4 +1,5 @@
 import argparse
+import array
 import collections
 
 
@@ -12,6 +13,40 @@ def _parse_args():
     return args.infile.read().splitlines()
 
 
+Program = collections.namedtuple('Program', ('ops', 'mags'))
+
+
+# Opcodes 0-3 move in the Ship.DIRECTIONS order, ROTATE's magnitude is in
+# clockwise quarter turns, and FORWARD moves along the heading/waypoint.
+ROTATE = 4
+FORWARD = 5
+OPCODES = {'E': 0, 'S': 1, 'W': 2, 'N': 3, 'L': ROTATE, 'R': ROTATE,
+           'F': FORWARD}
+
+# (a, b, c, d) such that a clockwise turn maps (x, y) to
+# (a*x + b*y, c*x + d*y), indexed by the number of quarter turns.
+ROTATION_MATRICES = (
+    (1, 0, 0, 1),
+    (0, -1, 1, 0),
+    (-1, 0, 0, -1),
+    (0, 1, -1, 0),
+)
+
+
+def compile_steps(steps):
+    """Pre-parses instruction strs into parallel opcode/magnitude arrays."""
+    ops = array.array('b')
+    mags = array.array('i')
+    for step in steps:
+        op = OPCODES[step[0]]
+        mag = int(step[1:])
+        if op == ROTATE:
+            mag = (mag // 90 * (-1 if step[0] == 'L' else 1)) % 4
+        ops.append(op)
+        mags.append(mag)
+    return Program(ops, mags)
+
+
 class Ship:
     DIRECTIONS = collections.OrderedDict(
         E=(1, 0),
@@ -19,37 +54,99 @@ class Ship:
         W=(-1, 0),
         N=(0, -1)
     )
+    HEADINGS = {vector: name for name, vector in DIRECTIONS.items()}
+    DIRECTION_VECTORS = tuple(DIRECTIONS.values())
 
     ROTATIONS = {
         'R': 1,
         'L': -1,
     }
 
+    # Whether N/S/E/W move the vector that F follows instead of the ship.
+    MOVES_VECTOR = False
+
     def __init__(self):
         self.x = 0
         self.y = 0
         self.rot = 'E'
 
+    def get_vector(self):
+        return self.DIRECTIONS[self.rot]
+
+    def set_vector(self, vx, vy):
+        self.rot = self.HEADINGS[(vx, vy)]
+
     def navigate(self, steps):
-        for step in steps:
-            op = step[0]
-            mag = int(step[1:])
-            if op in self.ROTATIONS:
-                self.rotate(op, mag)
-                continue
-            if op in self.DIRECTIONS:
-                self.move(op, mag)
-                continue
-            if op == 'F':
-                self.forward(mag)
-                continue
+        self.execute(compile_steps(steps))
+
+    def execute(self, program):
+        x, y = self.x, self.y
+        vx, vy = self.get_vector()
+        moves_vector = self.MOVES_VECTOR
+        for op, mag in zip(program.ops, program.mags):
+            if op == FORWARD:
+                x += vx * mag
+                y += vy * mag
+            elif op == ROTATE:
+                a, b, c, d = ROTATION_MATRICES[mag]
+                vx, vy = a * vx + b * vy, c * vx + d * vy
+            elif moves_vector:
+                dx, dy = self.DIRECTION_VECTORS[op]
+                vx += dx * mag
+                vy += dy * mag
+            else:
+                dx, dy = self.DIRECTION_VECTORS[op]
+                x += dx * mag
+                y += dy * mag
+        self.x, self.y = x, y
+        self.set_vector(vx, vy)
+
+    @classmethod
+    def transform(cls, program):
+        """Folds a whole program into one affine map of the ship's state.
+
+        Returns rows of coefficients over (x, y, vx, vy, 1) giving the final
+        x, y, vx and vy. Every instruction is linear in that state, so the
+        program only has to be walked once however many ships follow it.
+        """
+        x = [1, 0, 0, 0, 0]
+        y = [0, 1, 0, 0, 0]
+        vx = [0, 0, 1, 0, 0]
+        vy = [0, 0, 0, 1, 0]
+        for op, mag in zip(program.ops, program.mags):
+            if op == FORWARD:
+                x = [p + mag * q for p, q in zip(x, vx)]
+                y = [p + mag * q for p, q in zip(y, vy)]
+            elif op == ROTATE:
+                a, b, c, d = ROTATION_MATRICES[mag]
+                vx, vy = ([a * p + b * q for p, q in zip(vx, vy)],
+                          [c * p + d * q for p, q in zip(vx, vy)])
+            else:
+                dx, dy = cls.DIRECTION_VECTORS[op]
+                if cls.MOVES_VECTOR:
+                    vx[4] += dx * mag
+                    vy[4] += dy * mag
+                else:
+                    x[4] += dx * mag
+                    y[4] += dy * mag
+        return x, y, vx, vy
+
+    @classmethod
+    def navigate_fleet(cls, ships, steps):
+        """Navigates every ship in the fleet along the same instructions."""
+        rows = cls.transform(compile_steps(steps))
+        for ship in ships:
+            state = (ship.x, ship.y, *ship.get_vector(), 1)
+            x, y, vx, vy = (sum(k * s for k, s in zip(row, state))
+                            for row in rows)
+            ship.x, ship.y = x, y
+            ship.set_vector(vx, vy)
 
     def rotate(self, hand, degrees):
-        dirs = [x for x in self.DIRECTIONS]
-        turns = degrees // 90
-        idx = dirs.index(self.rot)
-        idx = (idx + (turns * self.ROTATIONS[hand])) % len(dirs)
-        self.rot = dirs[idx]
+        turns = (degrees // 90 * self.ROTATIONS[hand]) % 4
+        a, b, c, d = ROTATION_MATRICES[turns]
+        vx, vy = self.get_vector()
+        self.set_vector(a * vx + b * vy, c * vx + d * vy)
 
     def move(self, direction, mag):
         dx, dy = self.DIRECTIONS[direction]
@@ -61,27 +158,23 @@ class Ship:
 
 
 class WaypointShip(Ship):
+    MOVES_VECTOR = True
+
     def __init__(self, waypoint=(10, -1)):
         super().__init__()
         self.wx, self.wy = waypoint
 
+    def get_vector(self):
+        return self.wx, self.wy
+
+    def set_vector(self, vx, vy):
+        self.wx, self.wy = vx, vy
+
     def move(self, direction, mag):
         dx, dy = self.DIRECTIONS[direction]
         self.wx += mag * dx
         self.wy += mag * dy
 
-    def rotate(self, hand, degrees):
-        degrees = degrees % 360
-        if hand == 'L':
-            degrees = 360 - degrees
-        turns = degrees // 90
-        for turn in range(turns):
-            sy = 1 if self.wx >= 0 else -1
-            sx = 1 if self.wy < 0 else -1
-            old_wx = self.wx
-            self.wx = abs(self.wy) * sx
-            self.wy = abs(old_wx) * sy
-
     def forward(self, mag):
         self.x += self.wx * mag
         self.y += self.wy * mag
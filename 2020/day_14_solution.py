@@ -57,47 +57,71 @@ class Machine:
         value = value | self.or_mask
         self.mem[addr] = value
 
+    def total(self):
+        return sum(self.mem.values())
+
+
+def uncovered(fixed, floating, others):
+    """Counts the addresses in a cube that none of the other cubes cover.
+
+    A cube is a (fixed, floating) pair of bit masks standing for every address
+    that matches fixed on all the non-floating bits. The cube is split in half
+    on a bit that the first other cube pins down, until each piece is either
+    clear of the others or wholly covered by one of them.
+    """
+    if not others:
+        return 1 << floating.bit_count()
+    for _, other_floating in others:
+        if not floating & ~other_floating:
+            return 0
+    bit = floating & ~others[0][1]
+    bit &= -bit
+    floating ^= bit
+    total = 0
+    for half in (fixed, fixed | bit):
+        overlapping = [(other_fixed, other_floating)
+                       for other_fixed, other_floating in others
+                       if not (half ^ other_fixed) & bit & ~other_floating]
+        total += uncovered(half, floating, overlapping)
+    return total
+
 
 class MachineV2(Machine):
+    """Decoder v2, with memory kept symbolically as floating-address writes.
+
+    Each write is stored as (fixed, floating, value) rather than expanded into
+    its 2^floating concrete addresses, so memory and time scale with the
+    number of writes no matter how many bits the masks float.
+    """
     def __init__(self):
-        self.mem = {}
-        self.mask = '0' * 36
+        self.writes = []
+        self.ones = 0
+        self.floating = 0
         self.prog = tuple()
 
-    def gen_addr(addr_str, vals):
-        vals = vals[:]
-        generated = ''
-        for c in addr_str:
-            if c == 'X':
-                generated += vals.pop(0)
-            else:
-                generated
-
-    def decode(self, addr_str):
-        num_floating = self.mask.count('X')
-        max_floating = 2 ** num_floating
-        combos = [format(n, f'0{num_floating}b') for n in range(max_floating)]
-        addrs = []
-        for combo in combos:
-            bits = [b for b in combo]
-            addr = ''
-            for i in range(len(self.mask)):
-                if self.mask[i] == 'X':
-                    addr += bits.pop(0)
-                if self.mask[i] == '1':
-                    addr += '1'
-                if self.mask[i] == '0':
-                    addr += addr_str[i]
-            addrs.append(int(addr, 2))
-        return addrs
-
     def set_mask(self, mask_str):
-        self.mask = mask_str
+        self.ones = int(mask_str.replace('X', '0'), 2)
+        self.floating = int(mask_str.replace('1', '0').replace('X', '1'), 2)
 
     def write_mem(self, addr, value):
-        addrs = self.decode(format(addr, '036b'))
-        for a in addrs:
-            self.mem[a] = value
+        fixed = (addr | self.ones) & ~self.floating
+        self.writes.append((fixed, self.floating, value))
+
+    def total(self):
+        """Sums memory by walking writes newest first, later writes winning.
+
+        Each write only counts the addresses that no later write covers.
+        """
+        later = []
+        total = 0
+        for fixed, floating, value in reversed(self.writes):
+            overlapping = [(other_fixed, other_floating)
+                           for other_fixed, other_floating in later
+                           if not (fixed ^ other_fixed)
+                           & ~(floating | other_floating)]
+            total += value * uncovered(fixed, floating, overlapping)
+            later.append((fixed, floating))
+        return total
 
 
 def prog_from_data(data):
@@ -118,11 +142,11 @@ def main(data):
     machine = Machine()
     machine.load(prog)
     machine.run()
-    answer_one = sum(val for _, val in machine.mem.items())
+    answer_one = machine.total()
     machine_v2 = MachineV2()
     machine_v2.load(prog)
     machine_v2.run()
-    answer_two = sum(val for _, val in machine_v2.mem.items())
+    answer_two = machine_v2.total()
     return answer_one, answer_two
 
 
@@ -1,19 +1,64 @@
-def recitation(start, n):
-    seen = {}
-    for i, x in enumerate(start[:-1]):
-        seen[x] = i
-
-    last = start[-1]
-    for i in range(len(start) - 1, n - 1):
-        if last in seen:
-            cur = i - seen[last]
-        else:
-            cur = 0
-        seen[last] = i
-        last = cur
+import array
+import contextlib
+import mmap
+import time
+
+
+# Spoken numbers below this live in a plain list, which CPython indexes a
+# little faster than an array; they are also by far the most common ones.
+LOW_LIMIT = 1 << 16
+
+
+@contextlib.contextmanager
+def _turn_table(size, backing=None):
+    """Yields a zeroed table of uint32 last-seen turns, in memory or on disk."""
+    if backing is None:
+        yield array.array('I', [0]) * size
+        return
+    with open(backing, 'w+b') as f:
+        f.truncate(4 * size)
+        with mmap.mmap(f.fileno(), 4 * size) as mapped:
+            table = memoryview(mapped).cast('I')
+            try:
+                yield table
+            finally:
+                table.release()
+
+
+def recitation(start, n, backing=None):
+    """Returns the nth number spoken in the elves' memory game.
+
+    Last-seen turns are stored 1-based (0 means never spoken) in a table
+    preallocated for every possible value. Passing a backing file path puts
+    that table in a memory-mapped file so very long games needn't fit in RAM.
+    """
+    size = max(n, max(start) + 1)
+    small = [0] * min(LOW_LIMIT, size)
+    with _turn_table(size, backing) as seen:
+        for i, x in enumerate(start[:-1], 1):
+            if x < LOW_LIMIT:
+                small[x] = i
+            else:
+                seen[x] = i
+        last = start[-1]
+        for i in range(len(start), n):
+            if last < LOW_LIMIT:
+                prev = small[last]
+                small[last] = i
+            else:
+                prev = seen[last]
+                seen[last] = i
+            last = i - prev if prev else 0
     return last
 
 
+def timed_recitation(start, n, backing=None):
+    """Returns the nth number spoken and the throughput in turns per second."""
+    began = time.perf_counter()
+    last = recitation(start, n, backing)
+    return last, (n - len(start)) / (time.perf_counter() - began)
+
+
 def main():
     assert recitation((0, 3, 6), 8) == 0
     assert recitation((0, 3, 6), 2020) == 436
@@ -31,7 +76,8 @@ def main():
     assert recitation((2, 3, 1), 30000000) == 6895259
     assert recitation((3, 2, 1), 30000000) == 18
     assert recitation((3, 1, 2), 30000000) == 362
-    answer_two = recitation((7, 12, 1, 0, 16, 2), 30000000)
+    answer_two, rate = timed_recitation((7, 12, 1, 0, 16, 2), 30000000)
+    print(f'Part Two ran at {rate:,.0f} turns/s')
     return answer_one, answer_two
 
 
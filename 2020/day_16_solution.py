@@ -1,7 +1,14 @@
 import argparse
-import functools
+import bisect
 import itertools
 
+import bitset
+
+
+# Rule sets whose ranges all end below this get a bytearray bitmap with a flag
+# per value; anything bigger falls back to bisecting the merged ranges.
+LOOKUP_LIMIT = 1 << 20
+
 def _parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser()
@@ -12,6 +19,18 @@ def _parse_args():
     return args.infile.read().splitlines()
 
 
+class FieldValidator:
+    """Checks whether a value falls in any of a field's inclusive ranges."""
+    def __init__(self, ranges):
+        self.ranges = tuple(ranges)
+
+    def __call__(self, value):
+        for start, end in self.ranges:
+            if start <= value <= end:
+                return True
+        return False
+
+
 def field_and_validator(field_line):
     """Returns a field name and validator function for that field, or None"""
     try:
@@ -23,14 +42,7 @@ def field_and_validator(field_line):
     for r in ranges:
         start, end = r.split('-')
         range_tuples.append((int(start), int(end)))
-
-    def validator_func(value):
-        for start, end in range_tuples:
-            if start <= value <= end:
-                return True
-        return False
-
-    return field_name, validator_func
+    return field_name, FieldValidator(range_tuples)
 
 
 def rules_tickets_from_lines(lines):
@@ -54,41 +66,80 @@ def rules_tickets_from_lines(lines):
     return rules, your_ticket, nearby_tickets
 
 
-def invalidate_ticket(rules, ticket):
-    errors = []
-    for val in ticket:
-        validated = False
-        if not any(validator(val) for _, validator in rules.items()):
-            errors.append(val)
-    return errors
+def merged_ranges(rules):
+    """Returns the union of every rule's ranges as sorted disjoint ranges."""
+    merged = []
+    for start, end in sorted(itertools.chain.from_iterable(
+            validator.ranges for validator in rules.values())):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
 
 
-def error_rate(rules, tickets):
-    total_errors = []
-    for ticket in tickets:
-        total_errors.extend(invalidate_ticket(rules, ticket))
-    return sum(total_errors)
+def compile_rules(rules):
+    """Returns a single check for whether a value is valid for any field."""
+    merged = merged_ranges(rules)
+    if not merged:
+        return lambda value: False
+    if merged[0][0] >= 0 and merged[-1][1] < LOOKUP_LIMIT:
+        bitmap = bytearray(merged[-1][1] + 1)
+        for start, end in merged:
+            bitmap[start:end + 1] = b'\x01' * (end + 1 - start)
 
+        def in_bitmap(value):
+            return 0 <= value < len(bitmap) and bitmap[value]
 
-def determine_ticket_fields(rules, tickets):
-    """Given a rules dict and an iterable of tickets, return field names."""
-    fields = [set(rules.keys()) for _ in rules]
-    for i in range(len(tickets[0])):
-        for ticket in tickets:
-            for field_name, validator in rules.items():
-                if not validator(ticket[i]):
-                    fields[i].remove(field_name)
-                    if len(fields[i]) == 1:
-                        uniquefy_fields(*fields[i], i, fields)
-    return [f.pop() for f in fields]
+        return in_bitmap
+    starts = [start for start, _ in merged]
+    ends = [end for _, end in merged]
+
+    def in_any_range(value):
+        idx = bisect.bisect_right(starts, value) - 1
+        return idx >= 0 and value <= ends[idx]
+
+    return in_any_range
+
+
+def invalidate_ticket(is_valid, ticket):
+    """Returns the ticket's values that fail the check from compile_rules."""
+    return list(itertools.filterfalse(is_valid, ticket))
+
+
+def error_rate(is_valid, tickets):
+    values = itertools.chain.from_iterable(tickets)
+    return sum(itertools.filterfalse(is_valid, values))
 
 
-def uniquefy_fields(field_name, unique_idx, field_sets):
-    for i in range(len(field_sets)):
-        if i != unique_idx and field_name in field_sets[i]:
-            field_sets[i].remove(field_name)
-            if len(field_sets[i]) == 1:
-                uniquefy_fields(*field_sets[i], i, field_sets)
+def valid_tickets(is_valid, tickets):
+    return [ticket for ticket in tickets if all(map(is_valid, ticket))]
+
+
+def feasibility(rules, tickets):
+    """Returns, per column, a bitset of the rule indices valid for the column.
+
+    Each column's distinct values are only checked once against each rule.
+    """
+    validators = list(rules.values())
+    columns = []
+    for column in zip(*tickets):
+        values = set(column)
+        columns.append(bitset.union(
+            1 << idx for idx, validator in enumerate(validators)
+            if all(map(validator, values))))
+    return columns
+
+
+def determine_ticket_fields(rules, tickets):
+    """Given a rules dict and an iterable of tickets, return field names."""
+    names = list(rules)
+    candidates = feasibility(rules, tickets)
+    assignment = {}
+    bitset.propagate(candidates, assignment)
+    if len(assignment) < len(candidates):
+        bitset.match(candidates, assignment)
+    return [names[assignment[col]] for col in range(len(candidates))]
 
 
 def run_tests():
@@ -96,11 +147,13 @@ def run_tests():
         'class: 1-3 or 5-7',
         'row: 6-11 or 33-44',
         'seat: 13-40 or 45-50'))
-    assert not invalidate_ticket(rules, (7,1,14))
-    assert not invalidate_ticket(rules, (7,3,47))
-    assert invalidate_ticket(rules, (40,4,50))
-    assert invalidate_ticket(rules, (55,2,20))
-    assert invalidate_ticket(rules, (38,6,12))
+    is_valid = compile_rules(rules)
+    assert not invalidate_ticket(is_valid, (7,1,14))
+    assert not invalidate_ticket(is_valid, (7,3,47))
+    assert invalidate_ticket(is_valid, (40,4,50))
+    assert invalidate_ticket(is_valid, (55,2,20))
+    assert invalidate_ticket(is_valid, (38,6,12))
+    assert error_rate(is_valid, [(7,3,47), (40,4,50), (55,2,20), (38,6,12)]) == 71
     rules, yours, nearby = rules_tickets_from_lines((
         'class: 0-1 or 4-19',
         'row: 0-5 or 8-19',
@@ -117,10 +170,10 @@ def main(data):
     run_tests()
     rules, your_ticket, nearby_tickets = rules_tickets_from_lines(data)
     all_tickets = [your_ticket] + nearby_tickets
-    answer_one = error_rate(rules, all_tickets)
-    invalidator = functools.partial(invalidate_ticket, rules)
-    valid_tickets = list(itertools.filterfalse(invalidator, all_tickets))
-    field_names = determine_ticket_fields(rules, valid_tickets)
+    is_valid = compile_rules(rules)
+    answer_one = error_rate(is_valid, all_tickets)
+    field_names = determine_ticket_fields(
+        rules, valid_tickets(is_valid, all_tickets))
     print(field_names)
     answer_two = 1
     for i in range(len(field_names)):
@@ -1,11 +1,18 @@
 import argparse
 import operator
+import re
 
 OPERATIONS = {
     '+': operator.add,
     '*': operator.mul,
 }
 
+# Operator precedence tables; higher binds tighter, ties are left-associative.
+SAME_PRECEDENCE = {'+': 1, '*': 1}
+ADDITION_FIRST = {'+': 2, '*': 1}
+
+TOKEN_PATTERN = re.compile(r'\d+|\S')
+
 
 def _parse_args():
     """Parse command line arguments."""
@@ -19,85 +26,54 @@ def _parse_args():
 
 def tokens_from_str(expr):
     """Parse math nouveau tokens from a string."""
-    expr = expr.replace('(', ' ( ')
-    expr = expr.replace(')', ' ) ')
-    return expr.split()
+    return TOKEN_PATTERN.findall(expr)
 
 
-def pop_subexpr(tokens):
-    """Pop and return the full subexpr."""
-    result = []
-    nesting = 1
-    while nesting > 0:
-        token = tokens.pop(0)
-        if token == '(':
-            nesting += 1
-        if token == ')':
-            nesting -= 1
-        result.append(token)
-    return result[:-1]
+def _apply(values, op):
+    right = values.pop()
+    values[-1] = OPERATIONS[op](values[-1], right)
 
 
-def evaluate(tokens):
-    """Evaluate the math nouveau expression."""
-    acc = None
-    op = None
-    while tokens:
-        val = None
-        token = tokens.pop(0)
-        if token in OPERATIONS:
-            op = OPERATIONS[token]
-            continue
+def evaluate_with(tokens, precedence):
+    """Evaluate tokens under the given precedence table in one pass.
+
+    Shunting-yard, except operators are applied to a value stack as soon as
+    they are popped instead of being written out in RPN.
+    """
+    values = []
+    ops = []
+    for token in tokens:
+        if token in precedence:
+            while (ops and ops[-1] != '('
+                   and precedence[ops[-1]] >= precedence[token]):
+                _apply(values, ops.pop())
+            ops.append(token)
         elif token == '(':
-            subexpr_tokens = pop_subexpr(tokens)
-            val = evaluate(subexpr_tokens)
+            ops.append(token)
+        elif token == ')':
+            while ops[-1] != '(':
+                _apply(values, ops.pop())
+            ops.pop()
         else:
-            val = int(token)
-        if acc is None:
-            acc = val
-            continue
-        acc = op(acc, val)
-    return acc
-
+            values.append(int(token))
+    while ops:
+        _apply(values, ops.pop())
+    return values[-1]
 
-def pop_right_val(tokens):
-    while tokens and tokens[0] is not '*':
-        token = token.pop(0)
 
+def evaluate(tokens):
+    """Evaluate the math nouveau expression."""
+    return evaluate_with(tokens, SAME_PRECEDENCE)
 
 
 def adv_eval(tokens):
     """Evaluate the math nouveau expression with "advanced" rules."""
-    stack = []
-    while tokens:
-        token = tokens.pop(0)
-        if not stack:
-            if token == '(':
-                stack.append(adv_eval(pop_subexpr(tokens)))
-            else:
-                stack.append(int(token))
-            continue
-        if token in OPERATIONS:
-            stack.append(token)
-            continue
-        if token == '(':
-            val = adv_eval(pop_subexpr(tokens))
-        else:
-            val = int(token)
-        if stack[-1] == '+':
-            stack.pop()
-            temp = stack.pop()
-            stack.append(temp + val)
-            continue
-        if stack[-1] == '*':
-            stack.append(val)
-            continue
-
-    acc = stack.pop(0)
-    while stack:
-        stack.pop(0)
-        acc = acc * stack.pop(0)
-    return acc
+    return evaluate_with(tokens, ADDITION_FIRST)
+
+
+def sum_expressions(lines, precedence):
+    return sum(evaluate_with(TOKEN_PATTERN.findall(line), precedence)
+               for line in lines)
 
 
 def run_tests():
@@ -121,8 +97,8 @@ def run_tests():
 
 def main(input_lines):
     run_tests()
-    answer_one = sum(evaluate(tokens_from_str(line)) for line in input_lines)
-    answer_two = sum(adv_eval(tokens_from_str(line)) for line in input_lines)
+    answer_one = sum_expressions(input_lines, SAME_PRECEDENCE)
+    answer_two = sum_expressions(input_lines, ADDITION_FIRST)
     return answer_one, answer_two
 
 
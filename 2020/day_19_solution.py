@@ -1,5 +1,5 @@
 import argparse
-import collections
+import re
 
 
 def _parse_args():
@@ -12,31 +12,103 @@ def _parse_args():
     return args.infile.read().splitlines()
 
 
-Partial = collections.namedtuple('Partial', ('head', 'remainder'))
+class Grammar:
+    """A message grammar compiled once for matching many messages.
 
+    Rules that can't reach a cycle become one regex each. Recursive rules
+    (like the part two rules 8 and 11) are matched with a memoised chart of
+    the end positions each rule can reach from each start position, where
+    any non-recursive sub-rules are still checked by their regex.
+    """
+    def __init__(self, rules):
+        self._rules = rules
+        self._sources = {}
+        self._patterns = {}
+        self._lengths = {}
+        for rule in rules:
+            self._regex_source(rule, set())
 
-def can_gen(msg, rule, grammar):
-    """True if the msg can be produced by the rule from the grammar."""
-    stack = []
-    for choice in rule:
-        stack.append(Partial('', list(choice)))
-    while stack:
-        partial = stack.pop()
-        next_part = grammar[partial.remainder.pop(0)]
-        if isinstance(next_part, str):
-            new_head = partial.head + next_part
-            if not msg.startswith(new_head):
-                continue
-            if not partial.remainder:
-                if new_head == msg:
-                    return True
-                continue
-            stack.append(Partial(new_head, list(partial.remainder)))
-            continue
-        for choice in next_part:
-            stack.append(Partial(partial.head,
-                                 list(choice) + list(partial.remainder)))
-    return False
+    def _regex_source(self, rule, visiting):
+        """Returns the rule's regex source, or None if it reaches a cycle."""
+        if rule in self._sources:
+            return self._sources[rule]
+        if rule in visiting:
+            return None
+        expansion = self._rules[rule]
+        if isinstance(expansion, str):
+            self._sources[rule] = re.escape(expansion)
+            return self._sources[rule]
+        visiting.add(rule)
+        alternatives = []
+        for choice in expansion:
+            parts = [self._regex_source(part, visiting) for part in choice]
+            if None in parts:
+                alternatives = None
+                break
+            alternatives.append(''.join(parts))
+        visiting.discard(rule)
+        if alternatives is None:
+            self._sources[rule] = None
+        else:
+            self._sources[rule] = f'(?:{"|".join(alternatives)})'
+        return self._sources[rule]
+
+    def _pattern(self, rule):
+        if rule not in self._patterns:
+            self._patterns[rule] = re.compile(self._sources[rule])
+        return self._patterns[rule]
+
+    def _match_lengths(self, rule):
+        """Returns every length of message a non-recursive rule can match."""
+        if rule not in self._lengths:
+            expansion = self._rules[rule]
+            if isinstance(expansion, str):
+                lengths = {len(expansion)}
+            else:
+                lengths = set()
+                for choice in expansion:
+                    totals = {0}
+                    for part in choice:
+                        totals = {total + n for total in totals
+                                  for n in self._match_lengths(part)}
+                    lengths |= totals
+            self._lengths[rule] = frozenset(lengths)
+        return self._lengths[rule]
+
+    def _ends(self, msg, rule, start, chart):
+        """Returns the positions a match of the rule from start can end at."""
+        key = (rule, start)
+        if key in chart:
+            return chart[key]
+        # Left recursion isn't supported; pre-seeding the chart just keeps a
+        # left-recursive rule from looping forever.
+        chart[key] = frozenset()
+        if self._sources[rule] is not None:
+            pattern = self._pattern(rule)
+            ends = {start + n for n in self._match_lengths(rule)
+                    if start + n <= len(msg)
+                    and pattern.fullmatch(msg, start, start + n)}
+        else:
+            ends = set()
+            for choice in self._rules[rule]:
+                positions = {start}
+                for part in choice:
+                    positions = {end for pos in positions
+                                 for end in self._ends(msg, part, pos, chart)}
+                    if not positions:
+                        break
+                ends |= positions
+        chart[key] = frozenset(ends)
+        return chart[key]
+
+    def matches(self, msg, rule=0):
+        """True if the msg can be produced by the rule from the grammar."""
+        if self._sources[rule] is not None:
+            return self._pattern(rule).fullmatch(msg) is not None
+        return len(msg) in self._ends(msg, rule, 0, {})
+
+    def count_matches(self, messages, rule=0):
+        return sum(1 for msg in messages if self.matches(msg, rule))
 
 
 def run_tests():
@@ -55,7 +127,7 @@ def run_tests():
         "aaabbb",
         "aaaabbb",
     )
-    assert 2 == len([m for m in messages if can_gen(m, grammar[0], grammar)])
+    assert 2 == Grammar(grammar).count_matches(messages)
 
 
 def grammar_and_msgs(input_lines):
@@ -81,10 +153,10 @@ def grammar_and_msgs(input_lines):
 def main(input_lines):
     run_tests()
     grammar, messages = grammar_and_msgs(input_lines)
-    answer_one = len([m for m in messages if can_gen(m, grammar[0], grammar)])
+    answer_one = Grammar(grammar).count_matches(messages)
     grammar[8] = ((42,), (42, 8))
     grammar[11] = ((42, 31), (42, 11, 31))
-    answer_two = len([m for m in messages if can_gen(m, grammar[0], grammar)])
+    answer_two = Grammar(grammar).count_matches(messages)
     return answer_one, answer_two
 
 
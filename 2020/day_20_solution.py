@@ -3,7 +3,8 @@ import collections
 import functools
 import math
 import operator
-import re
+
+import bitset
 
 
 def _parse_args():
@@ -16,18 +17,95 @@ def _parse_args():
     return args.infile.read().splitlines()
 
 
+def pack_border(border):
+    return int(border.replace('#', '1').replace('.', '0'), 2)
+
+
+def reverse_bits(bits, width):
+    return int(format(bits, f'0{width}b')[::-1], 2)
+
+
+def side_of(rows, side_name):
+    if side_name == 'N':
+        return rows[0]
+    if side_name == 'E':
+        return ''.join((row[-1] for row in rows))
+    if side_name == 'S':
+        return rows[-1]
+    if side_name == 'W':
+        return ''.join((row[0] for row in rows))
+
+
+def flip_rows(rows):
+    """Flip rows over the vertical axis."""
+    return tuple(row[::-1] for row in rows)
+
+
+def rotate_rows(rows):
+    """Rotate rows 90 degrees counter-clockwise."""
+    return tuple(map(''.join, zip(*rows)))[::-1]
+
+
+def transform_rows(rows, transform):
+    """Applies one of the eight transforms: a flip, then CCW rotations."""
+    flips, rotations = divmod(transform, 4)
+    if flips:
+        rows = flip_rows(rows)
+    for _ in range(rotations):
+        rows = rotate_rows(rows)
+    return rows
+
+
 class Tile:
     """A square tile of arbitrary size."""
     SIDES = ('N', 'E', 'S', 'W')
-    MONSTER_TOP = re.compile(r'..................#.')
-    MONSTER_MID = re.compile(r'#....##....##....###')
-    MONSTER_BOT = re.compile(r'.#..#..#..#..#..#...')
-    MONSTER_SIZE = 15
+    MONSTER = ('..................#.',
+               '#....##....##....###',
+               '.#..#..#..#..#..#...')
 
     def __init__(self, tile_id, rows):
         self.tile_id = tile_id
         self.rows = tuple(rows)
         self.size = len(rows)
+        self.monster_scan = None
+        self._pack_borders()
+
+    def _pack_borders(self):
+        """Caches each side, read both ways, as a bit-packed int."""
+        self.borders = tuple(pack_border(self.side(s)) for s in self.SIDES)
+        self.reversed_borders = tuple(
+            reverse_bits(border, self.size) for border in self.borders)
+
+    def border(self, side_name, transform=0):
+        """Returns the packed border that would land on a side if transformed.
+
+        Reads it off the cached borders via the transform table, so nothing
+        is rebuilt.
+        """
+        src, flipped = TRANSFORMS[transform][SIDE_INDEX[side_name]]
+        if flipped:
+            return self.reversed_borders[src]
+        return self.borders[src]
+
+    def fits(self, border, which_side):
+        """Yields each transform that puts the packed border on the side.
+
+        A border that reads the same both ways fits two mirrored ways.
+        """
+        for src in range(len(self.SIDES)):
+            if self.borders[src] == border:
+                yield FITS[SIDE_INDEX[which_side], src, False]
+            if self.reversed_borders[src] == border:
+                yield FITS[SIDE_INDEX[which_side], src, True]
+
+    def fit(self, border, which_side):
+        """Returns a transform that puts the packed border on the side."""
+        return next(self.fits(border, which_side), None)
+
+    def orient(self, transform):
+        """Applies one of the eight transforms: a flip, then CCW rotations."""
+        self.rows = transform_rows(self.rows, transform)
+        self._pack_borders()
 
     def __repr__(self):
         lines = [f'\nTile {self.tile_id}:']
@@ -40,138 +118,230 @@ class Tile:
 
     @property
     def roughness(self):
-        return self.hashes - self.count_sea_monsters() * self.MONSTER_SIZE
+        if self.monster_scan is None:
+            self.find_sea_monsters()
+        covered = sum(bitset.popcount(row) for row in self.monster_scan.mask)
+        return self.hashes - covered
 
     def side(self, side_name):
-        if side_name == 'N':
-            return self.rows[0]
-        if side_name == 'E':
-            return ''.join((row[-1] for row in self.rows))
-        if side_name == 'S':
-            return self.rows[-1]
-        if side_name == 'W':
-            return ''.join((row[0] for row in self.rows))
+        return side_of(self.rows, side_name)
 
     def flip(self):
         """Flip the tile over the vertical axis."""
-        new_rows = []
-        for row in self.rows:
-            new_rows.append(row[::-1])
-        self.rows = new_rows
+        self.rows = flip_rows(self.rows)
+        self._pack_borders()
 
     def rotate(self):
         """Rotate the tile 90 degrees counter-clockwise."""
-        new_rows = []
-        for i in range(self.size - 1, -1, -1):
-            new_rows.append(''.join((row[i] for row in self.rows)))
-        self.rows = new_rows
+        self.rows = rotate_rows(self.rows)
+        self._pack_borders()
 
     def transform_to_fit(self, border_to_match, which_side):
         """Try to transform until our side matches the given border."""
-        for _ in range(2):
-            for __ in range(4):
-                if border_to_match == self.side(which_side):
-                    return True
-                self.rotate()
-            self.flip()
-        return False
+        transform = self.fit(pack_border(border_to_match), which_side)
+        if transform is None:
+            return False
+        self.orient(transform)
+        return True
+
+    def packed_rows(self):
+        """Returns each row as an int with bit x set if column x is a '#'."""
+        return [pack_border(row[::-1]) for row in self.rows]
+
+    def scan_sea_monsters(self, transform, packed=None):
+        """Finds every sea monster in the given monster orientation.
+
+        For each row, ANDing the image rows under each monster cell, shifted
+        back by the cell's column, leaves a bit set at every column a monster
+        starts in. Shifting those hits forward again marks the cells they
+        cover, so overlapping monsters are only subtracted once.
+        """
+        if packed is None:
+            packed = self.packed_rows()
+        cells, height, width = MONSTER_ORIENTATIONS[transform]
+        count = 0
+        mask = [0] * len(packed)
+        if width > len(self.rows[0]) or height > len(packed):
+            return MonsterScan(transform, count, mask)
+        starts = (1 << (len(self.rows[0]) - width + 1)) - 1
+        for i in range(len(packed) - height + 1):
+            hits = starts
+            for dr, dc in cells:
+                hits &= packed[i + dr] >> dc
+                if not hits:
+                    break
+            if hits:
+                count += bitset.popcount(hits)
+                for dr, dc in cells:
+                    mask[i + dr] |= hits << dc
+        return MonsterScan(transform, count, mask)
 
     def count_sea_monsters(self):
         """Count sea monsters present in our current orientation."""
-        monsters = 0
-        for i in range(1, self.size - 1):
-            for match in self.MONSTER_MID.finditer(self.rows[i]):
-                start, end = match.span()
-                if self.MONSTER_TOP.fullmatch(self.rows[i-1], start, end):
-                    if self.MONSTER_BOT.fullmatch(self.rows[i+1], start, end):
-                        monsters += 1
-        return monsters
+        return self.scan_sea_monsters(0).count
 
     def find_sea_monsters(self):
-        """Re-orient until we have sea monsters, then count them."""
-        for _ in range(2):
-            for __ in range(5):
-                monster_count = self.count_sea_monsters()
-                if monster_count > 0:
-                    return monster_count
-                self.rotate()
-            self.flip()
-        return 0
+        """Try every monster orientation until we find sea monsters."""
+        packed = self.packed_rows()
+        for transform in range(8):
+            self.monster_scan = self.scan_sea_monsters(transform, packed)
+            if self.monster_scan.count > 0:
+                break
+        return self.monster_scan.count
+
+
+def _transform_table():
+    """Works out where each side of a tile ends up under each transform.
+
+    Entry [transform][side] is (source side, reversed?) for the border that
+    lands on that side. Found by transforming a tiny tile with all-distinct
+    cells and looking its new sides up among the original ones.
+    """
+    sample = ('abc', 'def', 'ghi')
+    originals = [side_of(sample, side) for side in Tile.SIDES]
+    table = []
+    for transform in range(8):
+        moved = transform_rows(sample, transform)
+        entry = []
+        for side in Tile.SIDES:
+            border = side_of(moved, side)
+            if border in originals:
+                entry.append((originals.index(border), False))
+            else:
+                entry.append((originals.index(border[::-1]), True))
+        table.append(tuple(entry))
+    return tuple(table)
+
+
+SIDE_INDEX = {side: i for i, side in enumerate(Tile.SIDES)}
+TRANSFORMS = _transform_table()
+# (target side, source side, reversed?) -> the transform that does that.
+FITS = {(side, *TRANSFORMS[t][side]): t
+        for t in range(8) for side in range(len(Tile.SIDES))}
+
+
+def _monster_orientations():
+    """Returns (cells, height, width) of the sea monster under each transform."""
+    orientations = []
+    for transform in range(8):
+        rows = transform_rows(Tile.MONSTER, transform)
+        cells = tuple((r, c) for r, row in enumerate(rows)
+                      for c, char in enumerate(row) if char == '#')
+        orientations.append((cells, len(rows), len(rows[0])))
+    return tuple(orientations)
+
+
+MONSTER_ORIENTATIONS = _monster_orientations()
+MonsterScan = collections.namedtuple(
+    'MonsterScan', ('transform', 'count', 'mask'))
 
 
 SideMatch = collections.namedtuple('SideMatch', ('side', 'tile_id'))
 
 
-def find_matched_sides(tiles):
-    matches_by_id = {}
+def edge_index(tiles):
+    """Maps each canonical packed border to the (tile id, side)s that have it.
+
+    A border and its reverse share one canonical key: the smaller of the two.
+    """
+    index = collections.defaultdict(list)
     for tile in tiles.values():
-        matches = []
-        for side_name in Tile.SIDES:
-            side = tile.side(side_name)
-            matches_this_side = []
-            for other in tiles.values():
-                if tile == other:
-                    continue
-                for other_side_name in Tile.SIDES:
-                    if side in (other.side(other_side_name),
-                                other.side(other_side_name)[::-1]):
-                        matches_this_side.append(
-                            SideMatch(side_name, other.tile_id))
-            if len(matches_this_side) > 1:
-                raise RuntimeError('Side has more than one match!')
-            if matches_this_side:
-                matches.append(matches_this_side[0])
-        matches_by_id[tile.tile_id] = matches
+        for side_name, border, reverse in zip(
+                Tile.SIDES, tile.borders, tile.reversed_borders):
+            index[min(border, reverse)].append((tile.tile_id, side_name))
+    return index
+
+
+def find_matched_sides(tiles, index=None):
+    if index is None:
+        index = edge_index(tiles)
+    matches_by_id = {tile_id: [] for tile_id in tiles}
+    for owners in index.values():
+        if len(owners) > 2:
+            raise RuntimeError('Side has more than one match!')
+        if len(owners) == 2:
+            (first, first_side), (second, second_side) = owners
+            matches_by_id[first].append(SideMatch(first_side, second))
+            matches_by_id[second].append(SideMatch(second_side, first))
+    for matches in matches_by_id.values():
+        matches.sort(key=lambda match: SIDE_INDEX[match.side])
     return matches_by_id
 
 
+def _neighbor(tiles, index, tile, side_name):
+    """Returns the other tile sharing the tile's border on the given side."""
+    border = tile.border(side_name)
+    key = min(border, reverse_bits(border, tile.size))
+    for tile_id, _ in index[key]:
+        if tile_id != tile.tile_id:
+            return tiles[tile_id]
+    raise RuntimeError(f'No tile matches side {side_name} of {tile.tile_id}')
+
+
+def _place(tile, index, above, left):
+    """Orients the tile to sit below `above` and right of `left`.
+
+    Either neighbour is None on the edge of the puzzle, where the tile's
+    border must match no other tile. Checking both sides rules out the
+    mirrored fit of a border that reads the same both ways.
+    """
+    def outer(border):
+        return len(index[min(border, reverse_bits(border, tile.size))]) == 1
+
+    if left is not None:
+        candidates = tile.fits(left.border('E'), 'W')
+    else:
+        candidates = tile.fits(above.border('S'), 'N')
+    for transform in candidates:
+        north = tile.border('N', transform)
+        west = tile.border('W', transform)
+        if ((outer(north) if above is None else north == above.border('S'))
+                and (outer(west) if left is None
+                     else west == left.border('E'))):
+            tile.orient(transform)
+            return
+    raise RuntimeError(f'No orientation of tile {tile.tile_id} fits')
+
+
 def arrange_tiles(tiles):
-    """Return a list of rows of properly-arranged tiles."""
-    rows = []
-    matches = find_matched_sides(tiles)
+    """Return a list of rows of properly-arranged tiles.
+
+    Each placement is one hash lookup for the neighbouring tile plus a couple
+    of transform table lookups to orient it, so assembly is linear in tiles.
+    """
+    index = edge_index(tiles)
+    matches = find_matched_sides(tiles, index)
     corners = [t for t in matches if len(matches[t]) == 2]
 
     # Orient an arbitrary corner tile so that it's the NW-most tile.
     corner_tile = tiles[corners[0]]
     south_match, east_match = matches[corners[0]]
-    south_side = corner_tile.side(south_match.side)
-    east_side = corner_tile.side(east_match.side)
-    corner_tile.transform_to_fit(south_side, 'S')
-    if corner_tile.side('E') not in (east_side, east_side[::-1]):
+    south_side = corner_tile.border(south_match.side)
+    east_side = corner_tile.border(east_match.side)
+    corner_tile.orient(corner_tile.fit(south_side, 'S'))
+    if corner_tile.border('E') not in (
+            east_side, reverse_bits(east_side, corner_tile.size)):
         corner_tile.flip()
-    assert corner_tile.side('E') in (east_side, east_side[::-1])
+    assert corner_tile.border('E') in (
+        east_side, reverse_bits(east_side, corner_tile.size))
 
-    remaining = set(tiles.keys())
     grid_size = int(math.sqrt(len(tiles)))
-    row = [corner_tile]
-    remaining.remove(corner_tile.tile_id)
-    while len(rows) < grid_size:
+    rows = []
+    for r in range(grid_size):
+        if r == 0:
+            row = [corner_tile]
+        else:
+            above = rows[-1][0]
+            tile = _neighbor(tiles, index, above, 'S')
+            _place(tile, index, above, None)
+            row = [tile]
         while len(row) < grid_size:
-            old_num_remaining = len(remaining)
-            side_matches = matches[row[-1].tile_id]
-            for side_match in side_matches:
-                if side_match.tile_id not in remaining:
-                    continue
-                tile = tiles[side_match.tile_id]
-                if tile.transform_to_fit(row[-1].side('E'), 'W'):
-                    row.append(tile)
-                    remaining.remove(tile.tile_id)
-            if old_num_remaining == len(remaining):
-                raise RuntimeError("Unable to find tile continue row.")
+            left = row[-1]
+            tile = _neighbor(tiles, index, left, 'E')
+            _place(tile, index, rows[-1][len(row)] if r else None, left)
+            row.append(tile)
         rows.append(row)
-        if len(rows) == grid_size:
-            return rows
-        old_num_remaining = len(remaining)
-        side_matches = matches[row[0].tile_id]
-        for side_match in side_matches:
-            if side_match.tile_id not in remaining:
-                continue
-            tile = tiles[side_match.tile_id]
-            if tile.transform_to_fit(row[0].side('S'), 'N'):
-                row = [tile]
-                remaining.remove(tile.tile_id)
-        if old_num_remaining == len(remaining):
-            raise RuntimeError("Unable to find a tile to start next row.")
+    return rows
 
 
 def stitch_tiles(arrangement):
@@ -202,6 +372,23 @@ def parse_tiles(input_lines):
 
 
 def run_tests():
+    # Two shared borders here, '#####' and '#.#.#', read the same both ways,
+    # so orienting a tile from one of them alone can pick its mirror image.
+    tiles = parse_tiles(('Tile 1002:', '#####', '##...', '.##.#', '#####',
+                         '..#..', '',
+                         'Tile 1000:', '.#.##', '.##..', '##..#', '..#..',
+                         '#...#', '',
+                         'Tile 1003:', '.#.#.', '.#..#', '.....', '.##..',
+                         '#####', '',
+                         'Tile 1001:', '.####', '.###.', '.###.', '..#.#',
+                         '#.#.#'))
+    arranged = arrange_tiles(tiles)
+    for row in arranged:
+        for left, right in zip(row, row[1:]):
+            assert left.border('E') == right.border('W')
+    for upper, lower in zip(arranged, arranged[1:]):
+        for above, below in zip(upper, lower):
+            assert above.border('S') == below.border('N')
     with open('day_20_sample.txt', 'r') as sample_file:
         tiles = parse_tiles(sample_file.read().splitlines())
     assert 9 == len(tiles)
@@ -1,6 +1,8 @@
 import argparse
 import collections
 
+import bitset
+
 
 def _parse_args():
     """Parse command line arguments."""
@@ -17,53 +19,49 @@ AllergenInfo = collections.namedtuple(
     'AllergenInfo', ('allergen_map', 'inert_set'))
 
 
-class EliminationMap:
-    def __init__(self):
-        self._map = {}
-
-    def __getitem__(self, key):
-        if key not in self._map:
-            raise ValueError(f'{key} not in EliminationMap')
-        if 1 == len(self._map[key]):
-            return self._map[key].copy().pop()
-        return self._map[key].copy()
-
-    def __contains__(self, key):
-        return key in self._map
-
-    def __iter__(self):
-        for key, vals in self._map.items():
-            if len(vals) == 1:
-                yield key
-
-    def items(self):
-        """Iterator over only the solved items."""
-        for key, vals in self._map.items():
-            if len(vals) == 1:
-                yield key, vals.copy().pop()
-
-    def feed(self, key, values):
-        if key not in self._map:
-            self._map[key] = set(values)
-            return
-        try:
-            self._map[key] = set(values) & self._map[key]
-        except:
-            breakpoint()
-        if len(self._map[key]) == 1:
-            self.uniquefy(self[key])
-
-    def uniquefy(self, value):
-        to_uniquefy = [value]
-        while to_uniquefy:
-            for key, values in self._map.items():
-                if len(values) == 1:
-                    continue
-                if to_uniquefy[0] in values:
-                    values.remove(to_uniquefy[0])
-                    if len(values) == 1:
-                        to_uniquefy.append(self[key])
-            to_uniquefy.pop(0)
+class AllergenIndex:
+    """Foods with ingredient and allergen names interned to ints.
+
+    Each allergen's candidates are a bitset of ingredient ids: the ingredients
+    common to every food that lists the allergen.
+    """
+    def __init__(self, foods):
+        self.ingredients = []
+        self.allergens = []
+        self.candidates = []
+        self.counts = collections.Counter()
+        ingredient_ids = {}
+        allergen_ids = {}
+        for food in foods:
+            bits = 0
+            for name in food.ingredients:
+                if name not in ingredient_ids:
+                    ingredient_ids[name] = len(self.ingredients)
+                    self.ingredients.append(name)
+                bits |= 1 << ingredient_ids[name]
+                self.counts[ingredient_ids[name]] += 1
+            for name in food.allergens:
+                if name not in allergen_ids:
+                    allergen_ids[name] = len(self.allergens)
+                    self.allergens.append(name)
+                    self.candidates.append(bits)
+                else:
+                    self.candidates[allergen_ids[name]] &= bits
+
+    def inert(self):
+        """Returns ids of the ingredients that can't contain any allergen."""
+        suspects = bitset.union(self.candidates)
+        return [i for i in range(len(self.ingredients)) if not suspects >> i & 1]
+
+    def resolve(self):
+        """Returns a dict mapping each allergen name to its ingredient name."""
+        candidates = list(self.candidates)
+        assignment = {}
+        bitset.propagate(candidates, assignment)
+        if len(assignment) < len(candidates):
+            bitset.match(candidates, assignment)
+        return {self.allergens[allergen]: self.ingredients[ingredient]
+                for allergen, ingredient in assignment.items()}
 
 
 def parse_foods(input_lines):
@@ -77,15 +75,13 @@ def parse_foods(input_lines):
     return tuple(result)
 
 
-def allergen_info_for_foods(foods):
-    inert_set = set([ingr for food in foods for ingr in food.ingredients])
-    allergen_map = EliminationMap()
-    for food in foods:
-        for allergen in food.allergens:
-            allergen_map.feed(allergen, food.ingredients)
-    for _, ingredient in allergen_map.items():
-        inert_set.remove(ingredient)
-    return AllergenInfo(allergen_map, inert_set)
+def allergen_info_for_index(index):
+    inert_set = {index.ingredients[i] for i in index.inert()}
+    return AllergenInfo(index.resolve(), inert_set)
+
+
+def inert_appearances(index):
+    return sum(index.counts[i] for i in index.inert())
 
 
 def canonical_dangerous(allergen_info):
@@ -97,22 +93,17 @@ def run_tests():
                     'trh fvjkl sbzzf mxmxvkd (contains dairy)',
                     'sqjhc fvjkl (contains soy)',
                     'sqjhc mxmxvkd sbzzf (contains fish)')
-    foods = parse_foods(sample_input)
-    all_ingredients = [ingr for food in foods for ingr in food.ingredients]
-    allergen_info = allergen_info_for_foods(foods)
-    assert 5 == sum(
-        (all_ingredients.count(ingr) for ingr in allergen_info.inert_set))
-    foo = canonical_dangerous(allergen_info)
+    index = AllergenIndex(parse_foods(sample_input))
+    allergen_info = allergen_info_for_index(index)
+    assert 5 == inert_appearances(index)
     assert 'mxmxvkd,sqjhc,fvjkl' == canonical_dangerous(allergen_info)
 
 
 def main(input_lines):
     run_tests()
-    foods = parse_foods(input_lines)
-    all_ingredients = [ingr for food in foods for ingr in food.ingredients]
-    allergen_info = allergen_info_for_foods(foods)
-    answer_one = sum(
-        (all_ingredients.count(ingr) for ingr in allergen_info.inert_set))
+    index = AllergenIndex(parse_foods(input_lines))
+    allergen_info = allergen_info_for_index(index)
+    answer_one = inert_appearances(index)
     answer_two = canonical_dangerous(allergen_info)
     return answer_one, answer_two
 
@@ -1,5 +1,6 @@
 import argparse
 import collections
+import itertools
 
 
 def _parse_args():
@@ -33,31 +34,31 @@ def parse_players(input_lines):
 
 Player = collections.namedtuple('Player', ('id', 'deck'))
 
+HASH_MODULUS = (1 << 61) - 1
+HASH_BASE = 1000003
+
 
 class CombatGame:
     def __init__(self, *players):
-        self.players = list(players)
+        self.players = [Player(p.id, collections.deque(p.deck))
+                        for p in players]
         self.eliminated = []
         self.winner = None
         self.round = 0
 
     @staticmethod
     def score(player):
-        return(sum((i + 1) * x for i, x in enumerate(player.deck[::-1])))
-
-    def play_round(self, increment=True):
-        if increment:
-            self.round += 1
-        winning_card = max(p.deck[0] for p in self.players)
-        winner = [p for p in self.players if p.deck[0] == winning_card][0]
-        winner.deck.pop(0)
-        winner.deck.append(winning_card)
+        return(sum((i + 1) * x for i, x in enumerate(reversed(player.deck))))
+
+    def play_round(self):
+        self.round += 1
+        winner = max(self.players, key=lambda p: p.deck[0])
+        winner.deck.append(winner.deck.popleft())
         winner.deck.extend(
-            [p.deck.pop(0) for p in self.players if p != winner])
-        for player in self.players:
-            if len(player.deck) == 0:
-                self.players.remove(player)
-                self.eliminated.append(player)
+            [p.deck.popleft() for p in self.players if p is not winner])
+        for player in [p for p in self.players if not p.deck]:
+            self.players.remove(player)
+            self.eliminated.append(player)
 
     def resolve(self):
         while len(self.players) > 1:
@@ -65,39 +66,74 @@ class CombatGame:
         self.winner = self.players.pop()
 
 
-class RecursiveCombatGame(CombatGame):
-    def __init__(self, *players):
-        self._seen = set()
-        super().__init__(*players)
+def _deck_hash(deck):
+    h = 0
+    for card in deck:
+        h = (h * HASH_BASE + card) % HASH_MODULUS
+    return h
+
+
+def recursive_combat(one, two, cache):
+    """Plays Recursive Combat on two deques in place.
+
+    Returns True if player one wins. Seen states are tracked by rolling deck
+    hashes, polynomials in HASH_BASE with the top card as the leading term, so
+    drawing and appending cards update them in O(1). Sub-game winners are
+    cached by their starting decks.
+    """
+    powers = [1]
+    for _ in range(len(one) + len(two)):
+        powers.append(powers[-1] * HASH_BASE % HASH_MODULUS)
+    h1, h2 = _deck_hash(one), _deck_hash(two)
+    seen = set()
+    while one and two:
+        state = (h1, h2, len(one))
+        if state in seen:
+            return True
+        seen.add(state)
+        a, b = one.popleft(), two.popleft()
+        h1 = (h1 - a * powers[len(one)]) % HASH_MODULUS
+        h2 = (h2 - b * powers[len(two)]) % HASH_MODULUS
+        if a <= len(one) and b <= len(two):
+            sub_one = tuple(itertools.islice(one, a))
+            sub_two = tuple(itertools.islice(two, b))
+            key = (sub_one, sub_two)
+            if key not in cache:
+                high_card = max(sub_one)
+                if high_card > max(sub_two) and high_card >= a + b:
+                    # That card can never be recursed on, so player one
+                    # never loses it and wins outright or by repetition.
+                    cache[key] = True
+                else:
+                    cache[key] = recursive_combat(
+                        collections.deque(sub_one),
+                        collections.deque(sub_two),
+                        cache)
+            one_wins = cache[key]
+        else:
+            one_wins = a > b
+        if one_wins:
+            one.extend((a, b))
+            h1 = ((h1 * HASH_BASE + a) * HASH_BASE + b) % HASH_MODULUS
+        else:
+            two.extend((b, a))
+            h2 = ((h2 * HASH_BASE + b) * HASH_BASE + a) % HASH_MODULUS
+    return bool(one)
 
-    @staticmethod
-    def can_recurse(player):
-        return player.deck[0] < len(player.deck)
 
-    def state_redux(self):
-        return tuple([tuple(p.deck) for p in self.players])
+class RecursiveCombatGame(CombatGame):
+    def __init__(self, *players, cache=None):
+        super().__init__(*players)
+        self._cache = {} if cache is None else cache
 
-    def play_round(self):
-        if self.state_redux() in self._seen:
-            while len(self.players) > 1:
-                self.eliminated.append(self.players.pop())
-            return
-        self._seen.add(self.state_redux())
-        self.round += 1
-        if all([self.can_recurse(p) for p in self.players]):
-            sub_players = []
-            for p in self.players:
-                deck_size = p.deck[0]
-                sub_players.append(Player(p.id, p.deck[1:1+deck_size]))
-            sub_game = RecursiveCombatGame(*sub_players)
-            sub_game.resolve()
-            winner = [p for p in self.players if p.id == sub_game.winner.id][0]
-            winning_card = winner.deck.pop(0)
-            winner.deck.append(winning_card)
-            winner.deck.extend(
-                [p.deck.pop(0) for p in self.players if p != winner])
-            return
-        super().play_round(increment=False)
+    def resolve(self):
+        one, two = self.players
+        if recursive_combat(one.deck, two.deck, self._cache):
+            self.winner, loser = one, two
+        else:
+            self.winner, loser = two, one
+        self.players = []
+        self.eliminated.append(loser)
 
 
 def run_tests():
@@ -105,8 +141,8 @@ def run_tests():
     player_two = Player(2, [5, 8, 4, 7, 10])
     game = CombatGame(player_one, player_two)
     game.resolve()
-    assert player_two == game.winner
-    assert [3, 2, 10, 6, 8, 5, 9, 4, 7, 1] == game.winner.deck
+    assert player_two.id == game.winner.id
+    assert [3, 2, 10, 6, 8, 5, 9, 4, 7, 1] == list(game.winner.deck)
     assert 306 == CombatGame.score(game.winner)
     player_one = Player(1, [9, 2, 6, 3, 1])
     player_two = Player(2, [5, 8, 4, 7, 10])
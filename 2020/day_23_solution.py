@@ -1,5 +1,6 @@
 import argparse
-import sys
+import array
+import time
 
 
 def _parse_args():
@@ -11,99 +12,96 @@ def _parse_args():
     return parser.parse_args()
 
 
-class Cup:
-    def __init__(self, val):
-        self.val = val
-        self.left = self
-        self.right = self
+class CupRing:
+    """A circle of cups labelled 1 to n, stored as a successor table.
+
+    successors[label] is the label of the cup clockwise of that cup, so the
+    ring costs four bytes per cup and moving cups is a few index writes.
+    Labels beyond the starting sequence run consecutively up to total.
+    """
+    def __init__(self, sequence, total=None):
+        if total is None:
+            total = len(sequence)
+        sequence = list(sequence)
+        if sorted(sequence) != list(range(1, len(sequence) + 1)):
+            raise ValueError('Cups must be labelled 1 to n')
+        self.size = max(total, len(sequence))
+        self.successors = array.array('I', range(1, self.size + 2))
+        for label, successor in zip(sequence, sequence[1:]):
+            self.successors[label] = successor
+        if self.size > len(sequence):
+            self.successors[sequence[-1]] = len(sequence) + 1
+            self.successors[self.size] = sequence[0]
+        else:
+            self.successors[sequence[-1]] = sequence[0]
+        self.current = sequence[0]
 
     def __repr__(self):
-        return self.stringify(delimiter=' ', include_self=True)
-
-    def pop(self, n):
-        """Removes n cups from the circle and returns the new head"""
-        head = self
-        for _ in range(n):
-            head = head.right
-        popped_tail = head.left
-        popped_tail.right = self
-        head.left = self.left
-        self.left.right = head
-        self.left = popped_tail
-        return head
-
-    def insert(self, cup):
-        """Insert the ring of cups to our right."""
-        old_right = self.right
-        self.right = cup
-        cup.left.right = old_right
-        old_right.left = cup.left
-        cup.left = self
-
-    def stringify(self, delimiter=None, include_self=False):
-        """Returns a string representation of the linked list."""
+        return f'({self.current}) ' + self.stringify(self.current, ' ')
+
+    def play(self, num_moves):
+        successors = self.successors
+        highest = self.size
+        current = self.current
+        for _ in range(num_moves):
+            first = successors[current]
+            second = successors[first]
+            third = successors[second]
+            dest = current - 1 or highest
+            while dest == first or dest == second or dest == third:
+                dest = dest - 1 or highest
+            successors[current] = successors[third]
+            successors[third] = successors[dest]
+            successors[dest] = first
+            current = successors[current]
+        self.current = current
+
+    def after(self, label, n):
+        """Returns the labels of the n cups clockwise of the given cup."""
         result = []
+        for _ in range(n):
+            label = self.successors[label]
+            result.append(label)
+        return result
+
+    def stringify(self, label=1, delimiter=None):
+        """Returns the labels of every other cup, clockwise from label."""
         if delimiter is None:
             delimiter = ''
-        if include_self:
-            result.append(f'({self.val})')
-        cur = self
-        while cur != self.left:
-            result.append(str(cur.right.val))
-            cur = cur.right
-        return delimiter.join(result)
-
-
-def play_crab_cups(sequence, num_moves, debug=False):
-    cup_map = {}
-    lowest, highest = min(sequence), max(sequence)
-    first = Cup(sequence[0])
-    cup_map[first.val] = first
-
-    prev = first
-    for i in range(1, len(sequence)):
-        cup = Cup(sequence[i])
-        prev.insert(cup)
-        cup_map[cup.val] = cup
-        prev = cup
-
-    current = first
-    for move in range(num_moves):
-        if debug:
-            sys.stdout.write(f'move {move}/{num_moves}                \r')
-            sys.stdout.flush()
-        pickup = current.right
-        pickup.pop(3)
-        pickup_vals = [pickup.val, pickup.right.val, pickup.right.right.val]
-        dest = current.val
-        while dest == current.val or dest in pickup_vals or dest not in cup_map:
-            dest -= 1
-            if dest < lowest:
-                dest = highest
-        cup_map[dest].insert(pickup)
-        current = current.right
-
-    return cup_map
+        return delimiter.join(
+            str(x) for x in self.after(label, self.size - 1))
+
+
+def play_crab_cups(sequence, num_moves, total=None):
+    ring = CupRing(sequence, total)
+    ring.play(num_moves)
+    return ring
+
+
+def timed_crab_cups(sequence, num_moves, total=None):
+    """Returns the played ring and the throughput in moves per second."""
+    began = time.perf_counter()
+    ring = play_crab_cups(sequence, num_moves, total)
+    return ring, num_moves / (time.perf_counter() - began)
 
 
 def run_tests():
     sample_input = [int(x) for x in '389125467']
-    assert '92658374' == play_crab_cups(sample_input, 10)[1].stringify()
-    assert '67384529' == play_crab_cups(sample_input, 100)[1].stringify()
-    highest = max(sample_input)
-    sample_input.extend(range(highest + 1, 1000001))
-    cup_map = play_crab_cups(sample_input, 10000000)
-    assert 149245887792 == cup_map[1].right.val * cup_map[1].right.right.val
+    assert '92658374' == play_crab_cups(sample_input, 10).stringify()
+    assert '67384529' == play_crab_cups(sample_input, 100).stringify()
+    ring = play_crab_cups(sample_input, 10000000, 1000000)
+    x, y = ring.after(1, 2)
+    assert 149245887792 == x * y
 
 
 def main(sequence):
     run_tests()
     puzzle_input = [int(x) for x in sequence]
-    answer_one = play_crab_cups(puzzle_input, 100)[1].stringify()
-    highest = max(puzzle_input)
-    puzzle_input.extend(range(highest + 1, 1000001))
-    cup_map = play_crab_cups(puzzle_input, 10000000)
-    answer_two = cup_map[1].right.val * cup_map[1].right.right.val
+    answer_one = play_crab_cups(puzzle_input, 100).stringify()
+    ring, rate = timed_crab_cups(puzzle_input, 10000000, 1000000)
+    print(f'Part Two ran at {rate:,.0f} moves/s')
+    x, y = ring.after(1, 2)
+    answer_two = x * y
     return answer_one, answer_two
 
 
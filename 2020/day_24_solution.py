@@ -1,5 +1,6 @@
 import argparse
 import collections
+import re
 
 
 def _parse_args():
@@ -15,32 +16,30 @@ def _parse_args():
 LobbyLayout = collections.namedtuple('LobbyLayout', ('touches', 'colors'))
 
 
+DIRECTION_PATTERN = re.compile(r'se|sw|ne|nw|e|w')
+DIRECTION_OFFSETS = {'e': (1, 0),
+                     'se': (1, -1),
+                     'sw': (0, -1),
+                     'w': (-1, 0),
+                     'nw': (-1, 1),
+                     'ne': (0, 1)}
+
+
+def step_counts(directions):
+    """Returns a Counter of the steps taken in each direction."""
+    counts = collections.Counter(DIRECTION_PATTERN.findall(directions))
+    if sum(len(step) * n for step, n in counts.items()) != len(directions):
+        raise ValueError(f'Unrecognized directions: {directions}')
+    return counts
+
+
 def tile_for_dirs(directions):
     """Return the x, y pair for the tile arrived at by following directions."""
     x, y = 0, 0
-    while directions:
-        if directions.startswith('e'):
-            x += 1
-            directions = directions[1:]
-        elif directions.startswith('se'):
-            x += 1
-            y -= 1
-            directions = directions[2:]
-        elif directions.startswith('sw'):
-            y -= 1
-            directions = directions[2:]
-        elif directions.startswith('w'):
-            x -= 1
-            directions = directions[1:]
-        elif directions.startswith('nw'):
-            x -= 1
-            y += 1
-            directions = directions[2:]
-        elif directions.startswith('ne'):
-            y += 1
-            directions = directions[2:]
-        else:
-            raise ValueError(f'Unrecognized directions: {directions}')
+    for step, n in step_counts(directions).items():
+        dx, dy = DIRECTION_OFFSETS[step]
+        x += dx * n
+        y += dy * n
     return x, y
 
 
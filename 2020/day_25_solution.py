@@ -1,5 +1,6 @@
 import argparse
 import itertools
+import math
 
 
 def _parse_args():
@@ -14,21 +15,153 @@ def _parse_args():
     return parser.parse_args()
 
 
-def loop_size(key, subj):
-    value = 1
-    for i in itertools.count(start=1):
-        value = value * subj
-        value = value % 20201227
-        if value == key:
-            return i
+MODULUS = 20201227
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(n):
+    """Miller-Rabin over the first twelve prime bases.
+
+    Exact below 3.3e24, and a strong probable-prime test beyond that.
+    """
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in SMALL_PRIMES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def pollard_rho(n):
+    """Returns a nontrivial factor of an odd composite n (Brent's variant)."""
+    for c in itertools.count(1):
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+
+def factorize(n):
+    """Returns {prime: exponent} for n."""
+    factors = {}
+    for p in SMALL_PRIMES:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+        else:
+            d = pollard_rho(m)
+            stack.extend((d, m // d))
+    return factors
+
 
+def baby_step_giant_step(target, base, modulus, order):
+    """Returns x in [0, order) with base ** x == target, modulo modulus.
 
-def transform(subj, loop_size):
+    Takes O(sqrt(order)) time and memory. Raises ValueError if there's no
+    such x.
+    """
+    m = math.isqrt(order - 1) + 1
+    baby_steps = {}
     value = 1
-    for i in range(loop_size):
-        value = value * subj
-        value = value % 20201227
-    return value
+    for j in range(m):
+        baby_steps.setdefault(value, j)
+        value = value * base % modulus
+    giant_step = pow(base, -m, modulus)
+    value = target % modulus
+    for i in range(m):
+        j = baby_steps.get(value)
+        if j is not None:
+            return i * m + j
+        value = value * giant_step % modulus
+    raise ValueError(f'{target} is not a power of {base} mod {modulus}')
+
+
+def multiplicative_order(base, modulus=MODULUS, factors=None):
+    """Returns the least n > 0 with base ** n == 1, modulo a prime."""
+    if factors is None:
+        factors = factorize(modulus - 1)
+    order = modulus - 1
+    for q in factors:
+        while order % q == 0 and pow(base, order // q, modulus) == 1:
+            order //= q
+    return order
+
+
+def discrete_log(target, base, modulus=MODULUS):
+    """Returns the least x >= 0 with base ** x == target, modulo a prime.
+
+    Pohlig-Hellman splits the order of base into prime powers and solves each
+    digit with baby-step giant-step, so smooth orders are cheap and the cost
+    is bounded by the square root of the largest prime factor.
+    """
+    factors = factorize(modulus - 1)
+    order = multiplicative_order(base, modulus, factors)
+    x, combined = 0, 1
+    for q, e in factors.items():
+        while e and order % q ** e:
+            e -= 1
+        if not e:
+            continue
+        q_e = q ** e
+        sub_base = pow(base, order // q_e, modulus)
+        sub_target = pow(target, order // q_e, modulus)
+        gamma = pow(sub_base, q ** (e - 1), modulus)
+        digits = 0
+        for k in range(e):
+            residue = pow(sub_base, -digits, modulus) * sub_target % modulus
+            d = baby_step_giant_step(
+                pow(residue, q ** (e - 1 - k), modulus), gamma, modulus, q)
+            digits += d * q ** k
+        x += combined * ((digits - x) * pow(combined, -1, q_e) % q_e)
+        combined *= q_e
+    if pow(base, x, modulus) != target % modulus:
+        raise ValueError(f'{target} is not a power of {base} mod {modulus}')
+    return x
+
+
+def loop_size(key, subj, modulus=MODULUS):
+    """Returns the least positive loop size transforming subj into key."""
+    return (discrete_log(key, subj, modulus)
+            or multiplicative_order(subj, modulus))
+
+
+def transform(subj, loop_size, modulus=MODULUS):
+    return pow(subj, loop_size, modulus)
 
 
 def run_tests():
@@ -38,6 +171,12 @@ def run_tests():
     assert 11 == loop_size(door_key, 7)
     assert 14897079 == transform(17807724, 8)
     assert 14897079 == transform(5764801, 11)
+    # p - 1 = 2 * 2760721 * 4265441 has two large prime factors.
+    p = 23551385085923
+    base = pow(2, 4265441, p)
+    assert 2 * 2760721 == multiplicative_order(base, p)
+    assert 2760725 == discrete_log(pow(base, 2760725, p), base, p)
+    assert 2 * 2760721 == loop_size(1, base, p)
 
 
 def main(card_key, door_key):
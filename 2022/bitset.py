@@ -0,0 +1,38 @@
+"""Bitsets of rucksack items, kept as plain ints.
+
+Bit i is set when the item with priority i is present, so the lowest set bit
+of an intersection is the shared item's priority.
+"""
+
+import functools
+import operator
+import string
+from typing import Dict, Iterable
+
+# Bit positions match the rucksack item priorities: a-z are 1-26, A-Z are 27-52.
+PRIORITIES: Dict[str, int] = {
+    char: i + 1 for i, char in enumerate(string.ascii_letters)
+}
+
+
+def from_chars(chars: Iterable[str], index: Dict[str, int] = PRIORITIES) -> int:
+    """Returns the bitset of the given characters under an alphabet index."""
+    bits = 0
+    for char in chars:
+        bits |= 1 << index[char]
+    return bits
+
+
+def intersection(bitsets: Iterable[int]) -> int:
+    """Returns the intersection of all the given bitsets."""
+    return functools.reduce(operator.and_, bitsets)
+
+
+def popcount(bits: int) -> int:
+    """Returns the number of members in the bitset."""
+    return bits.bit_count()
+
+
+def lowest_bit(bits: int) -> int:
+    """Returns the index of the lowest set bit, or -1 for an empty set."""
+    return (bits & -bits).bit_length() - 1
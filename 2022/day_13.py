@@ -3,9 +3,14 @@
 import logging
 import re
 import textwrap
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Tuple, TypeVar
+
+PacketStr = TypeVar("PacketStr", str, bytes)
 
 INT_PATTERN = re.compile(r"\d+")
+TOKEN_PATTERN = r"(?P<int>\d+)|(?P<open>\[)|(?P<close>\])|(?P<sep>,)|(?P<bad>.)"
+STR_TOKEN_PATTERN = re.compile(TOKEN_PATTERN, re.DOTALL)
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.encode(), re.DOTALL)
 
 
 def run_tests() -> None:
@@ -59,6 +64,15 @@ def run_tests() -> None:
     assert Packet.from_str("[1,[2,[3,[4,[5,6,0]]]],8,9]") == Packet(
         [1, [2, [3, [4, [5, 6, 0]]]], 8, 9]
     )
+    assert Packet.from_bytes(b"[1,[2,[3,[4,[5,6,0]]]],8,9]") == Packet(
+        [1, [2, [3, [4, [5, 6, 0]]]], 8, 9]
+    )
+    assert Packet.parse_list_prefix("[[1],4][5]") == ([[1], 4], "[5]")
+    deep = "[" * 5000 + "]" * 5000
+    deeper = "[" * 5000 + "1" + "]" * 5000
+    assert Packet.from_str(deep) == Packet.from_str(deep)
+    assert Packet.from_str(deep) < Packet.from_str(deeper)
+    assert solve_part_1(f"{deeper}\n{deep}\n\n{deep}\n{deeper}") == 2
     assert solve_part_1(test_input) == 13
     assert solve_part_2(test_input) == 140
 
@@ -89,77 +103,108 @@ class Packet:
     def __eq__(self, other) -> bool:
         if not isinstance(other, Packet):
             return False
-        return self.data == other.data
+        return self._eq_impl(self.data, other.data)
 
     @classmethod
-    def from_str(cls, data_str: str) -> "Packet":
-        """Make a packet from a data str."""
-        data, suffix = cls.parse_list_prefix(data_str)
-        assert not suffix
+    def from_str(cls, data_str: PacketStr) -> "Packet":
+        """Make a packet from a data str (or bytes)."""
+        data, end = cls.parse_list_at(data_str)
+        assert end == len(data_str)
         logging.debug("Parsed packet data: %s", data)
         return cls(data)
 
     @classmethod
-    def parse_list_prefix(cls, s: str) -> Tuple[List, str]:
+    def from_bytes(cls, data_bytes: bytes) -> "Packet":
+        """Make a packet from raw bytes without decoding them first."""
+        return cls.from_str(data_bytes)
+
+    @classmethod
+    def parse_list_prefix(cls, s: PacketStr) -> Tuple[List, PacketStr]:
         """Return the initial list and the rest of the str after it."""
-        if not s.startswith("["):
-            raise ValueError("Str does not start w/ a list: %s", s)
-
-        remainder = list(reversed(s[1:]))
-        result: List = []
-        int_part = ""
-        while remainder:
-            char = remainder.pop()
-            if char in "0123456789":
-                int_part += char
-            elif char == ",":
-                if int_part:
-                    result.append(int(int_part))
-                    int_part = ""
-            elif char == "[":
-                remainder.append("[")
-                sublist, rest = cls.parse_list_prefix("".join(reversed(remainder)))
-                result.append(sublist)
-                remainder = list(reversed(rest))
-            elif char == "]":
-                if int_part:
-                    result.append(int(int_part))
-                return result, "".join(reversed(remainder))
-            else:
-                raise ValueError(
-                    f"Unknown token: {char}",
-                )
-
-        return result, "".join(reversed(remainder))
+        result, end = cls.parse_list_at(s)
+        return result, s[end:]
+
+    @classmethod
+    def parse_list_at(cls, s: PacketStr, start: int = 0) -> Tuple[List, int]:
+        """Return the list starting at index `start` and the index just past it.
+
+        Single pass over the input with an explicit stack of open lists, so the
+        input is never re-sliced and nesting depth isn't bound by recursion.
+        """
+        pattern = BYTES_TOKEN_PATTERN if isinstance(s, bytes) else STR_TOKEN_PATTERN
+        stack: List[List] = []
+        for match in pattern.finditer(s, start):
+            kind = match.lastgroup
+            if not stack and kind != "open":
+                raise ValueError(f"Str does not start w/ a list at index {start}")
+            if kind == "int":
+                stack[-1].append(int(match.group()))
+            elif kind == "open":
+                sublist: List = []
+                if stack:
+                    stack[-1].append(sublist)
+                stack.append(sublist)
+            elif kind == "close":
+                result = stack.pop()
+                if not stack:
+                    return result, match.end()
+            elif kind == "bad":
+                raise ValueError(f"Unknown token: {match.group()!r}")
+
+        if stack:
+            raise ValueError(f"Unterminated list starting at index {start}")
+        raise ValueError(f"Str does not start w/ a list at index {start}")
 
     @classmethod
     def _lt_impl(cls, left, right) -> Optional[bool]:
-        """Compare two packet data values and return True if left < right."""
+        """Compare two packet data values and return True if left < right.
+
+        Walks both values with an explicit stack of (left, right, index)
+        frames, so nesting depth isn't bound by recursion.
+        """
         if isinstance(left, int) and isinstance(right, int):
             logging.debug("Comparing two integers %s and %s", left, right)
-            if left == right:
-                return None
-            return left < right
-
-        if isinstance(left, int) and isinstance(right, list):
-            logging.debug("Converting %s to list to compare to %s", left, right)
-            return cls._lt_impl([left], right)
-
-        if isinstance(left, list) and isinstance(right, int):
-            logging.debug("Converting %s to list to compare to %s", right, left)
-            return cls._lt_impl(left, [right])
-
-        logging.debug("Comparting two lists %s and %s", left, right)
-        for idx in range(min(len(left), len(right))):
-            subresult = cls._lt_impl(left[idx], right[idx])
-            if subresult is None:
-                logging.debug("Two values were equal, continuing.")
+            return None if left == right else left < right
+        stack = [(cls._as_list(left), cls._as_list(right), 0)]
+        while stack:
+            left, right, idx = stack.pop()
+            if idx == min(len(left), len(right)):
+                if len(left) == len(right):
+                    logging.debug("Two lists were equal, continuing.")
+                    continue
+                logging.debug("One of the lists ran out of values to compare.")
+                return len(left) < len(right)
+            stack.append((left, right, idx + 1))
+            left_item, right_item = left[idx], right[idx]
+            if isinstance(left_item, int) and isinstance(right_item, int):
+                if left_item != right_item:
+                    return left_item < right_item
                 continue
-            return subresult
-        if len(left) == len(right):
-            return None
-        logging.debug("One of the lists ran out of values to compare.")
-        return len(left) < len(right)
+            stack.append((cls._as_list(left_item), cls._as_list(right_item), 0))
+        return None
+
+    @staticmethod
+    def _as_list(value) -> List:
+        if isinstance(value, int):
+            logging.debug("Converting %s to list to compare", value)
+            return [value]
+        return value
+
+    @staticmethod
+    def _eq_impl(left, right) -> bool:
+        """Structural equality of two packet data values, without recursion."""
+        stack = [(left, right)]
+        while stack:
+            left, right = stack.pop()
+            if isinstance(left, list) and isinstance(right, list):
+                if len(left) != len(right):
+                    return False
+                stack.extend(zip(left, right))
+            elif isinstance(left, list) or isinstance(right, list):
+                return False
+            elif left != right:
+                return False
+        return True
 
 
 def solve_part_1(puzzle_input: str) -> int:
@@ -1,9 +1,12 @@
 """https://adventofcode.com/2022/day/3"""
 
 import logging
+import string
 import textwrap
 from typing import List, Tuple
 
+import bitset
+
 
 def run_tests() -> None:
     """Runs regression tests using example inputs."""
@@ -35,9 +38,11 @@ def find_repeats(sacks: List[Tuple[str, str]]) -> str:
     """Returns all the repeat items from each sack in order of sacks."""
     repeats = ""
     for first_compartment, second_compartment in sacks:
-        intersection = set(first_compartment) & set(second_compartment)
-        assert len(intersection) == 1
-        repeats += intersection.pop()
+        intersection = bitset.from_chars(first_compartment) & bitset.from_chars(
+            second_compartment
+        )
+        assert bitset.popcount(intersection) == 1
+        repeats += item_for_priority(bitset.lowest_bit(intersection))
 
     return repeats
 
@@ -45,17 +50,20 @@ def find_repeats(sacks: List[Tuple[str, str]]) -> str:
 def find_badges(sacks: List[Tuple[str, str]]) -> str:
     """Returns the badges for each group of three sacks in order of groups."""
     badges = ""
+    sack_sets = [bitset.from_chars(first + second) for first, second in sacks]
     for group_idx in range(len(sacks) // 3):
-        set_1 = set.union(*(set(half) for half in sacks[group_idx * 3]))
-        set_2 = set.union(*(set(half) for half in sacks[group_idx * 3 + 1]))
-        set_3 = set.union(*(set(half) for half in sacks[group_idx * 3 + 2]))
-        badge_set = set_1 & set_2 & set_3
-        assert len(badge_set) == 1
-        badges += badge_set.pop()
+        badge_set = bitset.intersection(sack_sets[group_idx * 3 : group_idx * 3 + 3])
+        assert bitset.popcount(badge_set) == 1
+        badges += item_for_priority(bitset.lowest_bit(badge_set))
 
     return badges
 
 
+def item_for_priority(item_priority: int) -> str:
+    """Finds the item with the given priority."""
+    return string.ascii_letters[item_priority - 1]
+
+
 def priority(item: str) -> int:
     """Finds the priority of the given item."""
     if 65 <= ord(item) <= 90:
@@ -0,0 +1,16 @@
+"""Sets of small non-negative ints, kept as the bits of a plain int."""
+
+from typing import Iterable
+
+
+def from_ints(values: Iterable[int]) -> int:
+    """Returns the bitset with bit n set for each of the given values."""
+    bits = 0
+    for val in values:
+        bits |= 1 << val
+    return bits
+
+
+def popcount(bits: int) -> int:
+    """Returns the number of members in the bitset."""
+    return bits.bit_count()
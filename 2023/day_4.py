@@ -1,8 +1,11 @@
 """Solver for Advent of Code 2023, day 4."""
 
+import functools
 import re
 import textwrap
-from typing import Iterable, List, Set, Tuple
+from typing import Iterable, List, Tuple
+
+import bitset
 
 CARD_ID_RE = re.compile(r"Card\s+(?P<id>[0-9]+)")
 
@@ -10,7 +13,7 @@ CARD_ID_RE = re.compile(r"Card\s+(?P<id>[0-9]+)")
 class Scratchcard:
     """A scratchcard from Island Island."""
 
-    def __init__(self, id: int, numbers: Set[int], winning: Set[int]):
+    def __init__(self, id: int, numbers: int, winning: int):
         self.id = id
         self.numbers = numbers
         self.winning = winning
@@ -36,14 +39,14 @@ class Scratchcard:
         id = int(id_match.group("id"))
 
         numbers_part, winning_part = all_numbers_part.split("|")
-        numbers = set(int(n) for n in numbers_part.split())
-        winning = set(int(n) for n in winning_part.split())
+        numbers = bitset.from_ints(int(n) for n in numbers_part.split())
+        winning = bitset.from_ints(int(n) for n in winning_part.split())
 
         return cls(id, numbers, winning)
 
-    @property
+    @functools.cached_property
     def num_winners(self) -> int:
-        return len(self.numbers & self.winning)
+        return bitset.popcount(self.numbers & self.winning)
 
     @property
     def score(self) -> int: